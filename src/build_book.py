@@ -0,0 +1,110 @@
+"""Build an opening book for the AI.
+
+Every position reachable within --depth moves is solved exactly, spread over
+all CPU cores. Results are appended to a checkpoint file as they arrive, so
+an interrupted build picks up where it stopped when run again.
+
+    python src/build_book.py --depth 4
+
+Each extra move multiplies the work: the 6x7 board has 719 canonical
+positions within 4 moves, 11,094 within 6 and 129,498 within 8, and
+positions this close to the start can take many minutes each to solve.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from components import SolverPool
+from components.GameState import GameState
+from components.OpeningBook import write_book
+
+
+def solve_position(position):
+    # (key, score, best column) of a canonical position
+    scores = SolverPool.solver.analyze(position)
+    column = SolverPool.solver.best_column(scores)
+    return position.key, scores[column], column
+
+
+def enumerate_positions(rows, columns, connect, depth):
+    """Canonical positions, still in play, reachable within depth moves."""
+    state = GameState(rows, columns, connect)
+    positions = {}
+
+    def visit(ply):
+        position = state.position().canonical()
+        if position.key in positions:
+            return  # Already reached by another move order or as a mirror image
+        positions[position.key] = position
+        if ply == depth:
+            return
+        for column in range(columns):
+            if not state.can_drop(column):
+                continue
+            state.make_move(column)
+            if not state.is_over():
+                visit(ply + 1)
+            state.unmake_move()
+
+    visit(0)
+    return list(positions.values())
+
+
+def read_checkpoint(path):
+    # Entries solved by earlier runs; a line cut short by an interruption is ignored
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path) as checkpoint:
+        for line in checkpoint:
+            fields = line.split()
+            if len(fields) == 3 and line.endswith('\n'):
+                key, score, column = map(int, fields)
+                entries[key] = (key, score, column)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mapped opening book for the AI.")
+    parser.add_argument('--depth', type=int, default=4,
+                        help="Moves from the empty board to cover; the cost grows roughly tenfold per two moves")
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4)
+    parser.add_argument('--output', default='assets/books/opening_book.bin')
+    parser.add_argument('--checkpoint', help="Progress file (default: output + '.checkpoint')")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--table-mb', type=int, default=64, help="Transposition table size per worker")
+    args = parser.parse_args()
+    if (args.rows + 1) * args.columns > 64:
+        parser.error("Position keys of this board do not fit the 64-bit book records")
+    checkpoint_path = args.checkpoint or args.output + '.checkpoint'
+
+    positions = enumerate_positions(args.rows, args.columns, args.connect, args.depth)
+    entries = read_checkpoint(checkpoint_path)
+    pending = [position for position in positions if position.key not in entries]
+    pending.sort(key=lambda position: -position.moves)  # Deep positions are quick to solve
+    print(f"{len(positions)} positions, {len(entries)} already solved, {len(pending)} to go")
+
+    started = time.monotonic()
+    if pending:
+        directory = os.path.dirname(checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with multiprocessing.Pool(args.workers, SolverPool.init_worker,
+                                  (args.rows, args.columns, args.connect, args.table_mb)) as pool, \
+                open(checkpoint_path, 'a') as checkpoint:
+            for done, (key, score, column) in enumerate(pool.imap_unordered(solve_position, pending), 1):
+                entries[key] = (key, score, column)
+                checkpoint.write(f"{key} {score} {column}\n")
+                checkpoint.flush()
+                if done % 100 == 0 or done == len(pending):
+                    print(f"{done}/{len(pending)} solved in {time.monotonic() - started:.0f}s")
+
+    write_book(args.output, args.rows, args.columns, args.connect, args.depth,
+               [entries[position.key] for position in positions])
+    print(f"Wrote {len(positions)} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
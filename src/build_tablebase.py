@@ -0,0 +1,102 @@
+"""Build a win/draw/loss tablebase by retrograde analysis, and check the engines against it.
+
+Small boards are solved completely from the empty board:
+
+    python src/build_tablebase.py --rows 4 --columns 5
+
+For the standard board, pass a late position as 1-based column digits; every
+position that can follow it is solved:
+
+    python src/build_tablebase.py --moves 444444333333555555222222666666
+"""
+import argparse
+import os
+import random
+import time
+from components.GameState import GameState
+from components.Search import Search, TABLEBASE_WIN
+from components.Solver import Solver
+from components.Tablebase import Tablebase, TablebaseIndex, build_tablebase, WIN, DRAW, LOSS
+
+
+def random_positions(base, count, seed=0):
+    # Positions still in play after random moves from the base moves
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState(*base[:3])
+        for column in base[3]:
+            state.make_move(column)
+        for _ in range(rng.randrange(state.rows * state.columns - len(base[3]))):
+            columns = [column for column in range(state.columns) if state.can_drop(column)]
+            state.make_move(rng.choice(columns))
+            if state.is_over():
+                break
+        if not state.is_over():
+            positions.append(state.position())
+    return positions
+
+
+def validate(tablebase, base, count):
+    """Compare the solver and the heuristic search with the table on random positions.
+
+    The engines are checked twice: on their own, which checks the table,
+    and with the table probed at their leaves, as the game's AI uses it.
+    """
+    names = {WIN: 'win', DRAW: 'draw', LOSS: 'loss'}
+    positions = random_positions(base, count)
+    for attached in (False, True):
+        solver = Solver(*base[:3])
+        search = Search(*base[:3])
+        if attached:
+            solver.tablebase = search.tablebase = tablebase
+        solver_errors = search_errors = 0
+        for position in positions:
+            expected = tablebase.probe_position(position)
+            score = solver.solve(position)
+            if (WIN if score > 0 else LOSS if score < 0 else DRAW) != expected:
+                solver_errors += 1
+                print(f"Solver disagrees on {position}: {score} vs {names[expected]}")
+            # The search only claims a result when it finds a forced win
+            column, score, depth = search.iterative_deepening(position, 0.2)
+            if abs(score) >= TABLEBASE_WIN and (WIN if score > 0 else LOSS) != expected:
+                search_errors += 1
+                print(f"Search disagrees on {position}: {score} at depth {depth} vs {names[expected]}")
+        print(f"{count} positions checked {'with' if attached else 'without'} the table attached: "
+              f"{solver_errors} solver and {search_errors} search disagreements")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a retrograde win/draw/loss tablebase.")
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4)
+    parser.add_argument('--moves', default='', help="Base position as 1-based column digits")
+    parser.add_argument('--output', help="Table file (default: assets/tablebases/ROWSxCOLUMNS[-MOVES].bin)")
+    parser.add_argument('--validate', type=int, default=0, metavar='N', help="Check the engines on N random positions")
+    args = parser.parse_args()
+    output = args.output or os.path.join('assets', 'tablebases', f"{args.rows}x{args.columns}"
+                                         f"{'-' + args.moves if args.moves else ''}.bin")
+
+    try:
+        state = GameState.from_moves(args.moves, args.rows, args.columns, args.connect)
+    except ValueError as error:
+        parser.error(str(error))
+    position = state.position()
+    index = TablebaseIndex(args.rows, args.columns, args.connect, position.imperial, position.occupied)
+    print(f"{index.count} positions, {(index.count + 3) // 4} bytes")
+
+    if not os.path.exists(output):
+        started = time.monotonic()
+        build_tablebase(output, args.rows, args.columns, args.connect, position.imperial, position.occupied,
+                        progress=lambda added: print(f"{added} pieces to place done in {time.monotonic() - started:.0f}s"))
+        print(f"Wrote {output}")
+    tablebase = Tablebase(output)
+    names = {WIN: 'win', DRAW: 'draw', LOSS: 'loss'}
+    print(f"Base position: {names[tablebase.probe_position(position)]} for the side to move")
+    if args.validate:
+        validate(tablebase, (args.rows, args.columns, args.connect, state.history), args.validate)
+
+
+if __name__ == "__main__":
+    main()
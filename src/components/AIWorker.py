@@ -0,0 +1,206 @@
+import glob
+import os
+import time
+from .BackgroundWorker import BackgroundWorker, serve
+from .MCTS import MCTS
+from .OpeningBook import OpeningBook
+from .PolicyValueNet import PolicyValueNet
+from .Search import Search, SearchTimeout
+from .SearchStats import SearchStats
+from .Solver import Solver
+from .Tablebase import Tablebase, TablebaseSet
+
+# AI strength levels, and the alternative Monte Carlo engine
+HEURISTIC, PERFECT, MONTE_CARLO = 'heuristic', 'perfect', 'monte-carlo'
+MCTS_PLAYOUTS = 5000  # Playouts per Monte Carlo move
+
+
+def load_book(path, rows, columns, connect):
+    # Opening book for this board geometry, or None if there is no usable book file
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        book = OpeningBook(path)
+    except ValueError:
+        return None
+    if not book.matches(rows, columns, connect):
+        book.close()
+        return None
+    return book
+
+
+def load_tablebases(directory, rows, columns, connect):
+    # Every tablebase in directory for this board geometry, probed as one, or None if there are none
+    if directory is None or not os.path.isdir(directory):
+        return None
+    tables = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.bin'))):
+        try:
+            table = Tablebase(path)
+        except (OSError, ValueError):
+            continue
+        if table.matches(rows, columns, connect):
+            tables.append(table)
+        else:
+            table.close()
+    return TablebaseSet(tables) if tables else None
+
+
+def load_network(path, rows, columns):
+    # Policy/value network for this board size, or None if there is no usable weights file
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        network = PolicyValueNet.load(path)
+    except (OSError, KeyError, ValueError):
+        return None  # Truncated, corrupt or incomplete weights: fall back to random playouts
+    return network if (network.rows, network.columns) == (rows, columns) else None
+
+
+def run_worker(rows, columns, connect, requests, results, latest, book_path=None, network_path=None,
+               tablebase_dir=None):
+    # Worker process entry point: search each requested position under its time budget
+    book = load_book(book_path, rows, columns, connect)
+    network = load_network(network_path, rows, columns)
+    search = Search(rows, columns, connect)
+    solver = Solver(rows, columns, connect, book=book)
+    search.tablebase = solver.tablebase = load_tablebases(tablebase_dir, rows, columns, connect)
+    # Daemon processes cannot start a pool, so playouts run here; a network is fed hundreds of leaves per call
+    mcts = MCTS(rows, columns, connect, MCTS_PLAYOUTS, batch_size=256 if network else 64, workers=0, evaluator=network)
+
+    def think(position, time_limit, max_depth, level, should_stop, report):
+        # (depth, column, score, SearchStats) of the move to play in position
+        entry = book.lookup(position) if book is not None else None
+        if entry is not None:
+            score, column = entry  # Known opening position: no thinking needed
+            stats = SearchStats('book')
+            stats.start()
+            stats.finish(0)
+            return rows * columns - position.moves, column, score, stats
+        if level == MONTE_CARLO:
+            mcts.should_stop = should_stop
+            column, score = mcts.best_move(position)
+            return 0, column, score, mcts.stats
+        if level == PERFECT:
+            deadline = time.monotonic() + time_limit
+            try:
+                column, score, _ = solver.solve_move(position, time_limit, should_stop)
+                return rows * columns - position.moves, column, score, solver.stats
+            except SearchTimeout:
+                # Too early in the game to solve in time: the heuristic search gets what is left of the budget
+                time_limit = max(0.0, deadline - time.monotonic())
+        column, score, depth = search.iterative_deepening(position, time_limit, max_depth, report, should_stop)
+        return depth, column, score, search.stats
+
+    for request_id, (position, time_limit, max_depth, level, ponder), should_stop in serve(requests, latest):
+        try:
+            if not ponder:
+                def report(depth, column, score):
+                    results.put((request_id, position, depth, column, score, None, False))
+
+                depth, column, score, stats = think(position, time_limit, max_depth, level, should_stop, report)
+                results.put((request_id, position, depth, column, score, stats, True))
+                continue
+            # Pondering: answer the opponent's likely replies in advance, the predicted one first
+            current, mask = search.split(position)
+            possible = (mask + search.bottom) & search.board_mask
+            wins = possible & search.threats(current, mask)
+            predicted = search.iterative_deepening(position, time_limit / 4, max_depth, should_stop=should_stop)[0]
+            for column in [predicted] + [c for c in search.order if c != predicted]:
+                move = possible & search.column_masks[column]
+                if not move or move & wins or (mask | move) == search.board_mask:
+                    continue  # Full column, or a reply that ends the game
+                reply = solver.play_position(position, column)
+                answer = think(reply, time_limit, max_depth, level, should_stop, None)
+                if should_stop():
+                    break  # The answer may be cut short: never report it
+                depth, column, score, stats = answer
+                results.put((request_id, reply, depth, column, score, stats, True))
+        except SearchTimeout:
+            pass  # Cancelled
+
+
+class AIWorker(BackgroundWorker):
+    """Runs the AI search in a background process so the render loop never blocks.
+
+    start() hands a Position to the worker and returns immediately; the game
+    loop calls poll() once per frame, which drains finished depths without
+    waiting and returns the chosen column once the time budget is used up.
+    Positions found in the optional opening book are answered without searching,
+    and tablebases in the optional tablebase directory give exact results at
+    the leaves of both searches.
+
+    During the opponent's turn, ponder() has the worker answer the replies
+    it expects in advance. If the opponent plays one of them, start() finds
+    the answer ready and poll() returns it on the next frame.
+    """
+
+    name = 'AI worker'
+
+    def __init__(self, rows=6, columns=7, connect=4, book_path=None, network_path=None, tablebase_dir=None):
+        super().__init__(run_worker, rows, columns, connect, book_path, network_path, tablebase_dir)
+        self.position = None  # Position being searched or pondered
+        self.best = None  # (depth, column, score) of the deepest completed iteration
+        self.stats = None  # SearchStats of the last finished search
+        self.thinking = False
+        self.pondering = False
+        self.pondered = {}  # Position after an opponent reply -> (depth, column, score, stats) to answer it with
+        self.ready = None  # Pondered column waiting to be returned by poll()
+
+    def send(self, position, time_limit, max_depth, level, ponder):
+        self.position = position
+        self.best = None
+        self.ready = None
+        super().send(position, time_limit, max_depth, level, ponder)
+
+    def start(self, position, time_limit, max_depth=None, level=HEURISTIC):
+        answer = None
+        if self.pondering:
+            self.poll()  # Collect answers the worker finished since the last frame
+            answer = self.pondered.get(position)
+        if answer is not None:
+            # Pondered hit: stop the worker and answer without searching
+            self.cancel()
+            self.position, self.best, self.stats, self.ready = position, answer[:3], answer[3], answer[1]
+            self.thinking = True
+            return
+        self.pondering = False
+        self.thinking = True
+        self.send(position, time_limit, max_depth, level, False)
+
+    def ponder(self, position, time_limit, max_depth=None, level=HEURISTIC):
+        """Answer the likely replies to position in the background, with the same settings as start()."""
+        self.pondered = {}
+        self.pondering = True
+        self.thinking = False
+        self.send(position, time_limit, max_depth, level, True)
+
+    def cancel(self):
+        super().cancel()
+        self.position = None
+        self.best = None
+        self.ready = None
+        self.thinking = False
+        self.pondering = False
+
+    def poll(self):
+        """Drain results without blocking; return the chosen column once the search is done.
+
+        Raises WorkerDied if the worker process is gone.
+        """
+        if self.ready is not None:
+            column, self.ready = self.ready, None
+            self.thinking = False
+            return column
+        for request_id, position, depth, column, score, stats, done in self.drain():
+            if request_id != self.request_id:
+                continue  # Result for a cancelled search
+            if self.pondering:
+                self.pondered[position] = (depth, column, score, stats)
+                continue
+            self.best = (depth, column, score)
+            if done:
+                self.stats = stats
+                self.thinking = False
+                return column
+        return None
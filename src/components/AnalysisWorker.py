@@ -0,0 +1,80 @@
+from .AIWorker import load_tablebases
+from .BackgroundWorker import BackgroundWorker, serve
+from .Search import Search, SearchTimeout, WIN_SCORE, TABLEBASE_WIN
+
+
+def run_analysis(rows, columns, connect, requests, results, latest, tablebase_dir=None):
+    # Analysis process entry point: deepen on each requested position until told otherwise
+    search = Search(rows, columns, connect)
+    search.tablebase = load_tablebases(tablebase_dir, rows, columns, connect)  # Same tables as the AI and the review
+    for request_id, (position,), should_stop in serve(requests, latest):
+        def report(depth, scores):
+            results.put((request_id, depth, scores))
+
+        try:
+            search.column_scores(position, report, should_stop=should_stop)
+        except SearchTimeout:
+            pass  # Superseded
+
+
+def format_score(score):
+    """Short label for a column score: W3 wins in three own moves, L2 loses in two, +1 leans ahead."""
+    if score is None:
+        return ''
+    if abs(score) > WIN_SCORE - 1000:
+        moves = (WIN_SCORE - abs(score)) // 2 + 1  # Moves of the winning side, this one included
+        return f"{'W' if score > 0 else 'L'}{moves}"
+    if abs(score) >= TABLEBASE_WIN:
+        return 'W' if score > 0 else 'L'  # Proven by a tablebase, length unknown
+    return f"{score:+d}" if score else '0'
+
+
+class AnalysisWorker(BackgroundWorker):
+    """Evaluates every column of a position in a background process.
+
+    start() hands over a position and returns immediately; the worker then
+    searches one ply deeper at a time, forever refining, and sends the
+    scores of each completed depth back. The game loop calls poll() once
+    per frame, which drains the results queue without waiting, so the
+    render loop keeps its frame rate however deep the analysis goes.
+    Tablebases in the optional tablebase directory give exact results at
+    the leaves, shown as a plain W or L.
+    """
+
+    name = 'analysis'
+
+    def __init__(self, rows=6, columns=7, connect=4, tablebase_dir=None):
+        super().__init__(run_analysis, rows, columns, connect, tablebase_dir)
+        self.position = None  # Position being analysed
+        self.depth = 0  # Deepest depth with scores so far
+        self.scores = None  # Score of every column for the side to move, None for full columns
+
+    def start(self, position):
+        self.position = position
+        self.depth = 0
+        self.scores = None
+        self.send(position)  # Also stops the analysis of the previous position
+
+    def cancel(self):
+        super().cancel()
+        self.position = None
+        self.depth = 0
+        self.scores = None
+
+    def poll(self):
+        """Drain results without blocking; return True if the scores changed.
+
+        Raises WorkerDied if the analysis process is gone.
+        """
+        changed = False
+        for request_id, depth, scores in self.drain():
+            if request_id != self.request_id:
+                continue  # Scores for a position no longer on the board
+            self.depth, self.scores = depth, scores
+            changed = True
+        return changed
+
+    def best_column(self):
+        if not self.scores:
+            return None
+        return max((c for c, score in enumerate(self.scores) if score is not None), key=lambda c: self.scores[c])
@@ -0,0 +1,76 @@
+import multiprocessing
+import queue
+
+
+class WorkerDied(Exception):
+    """Raised by poll() when a background worker has exited or failed, e.g. after a crash."""
+
+
+def check_alive(process, name):
+    # Called once the results queue is empty, so nothing the process sent before exiting is lost
+    if not process.is_alive():
+        raise WorkerDied(f"The {name} process exited unexpectedly (exit code {process.exitcode}).")
+
+
+def serve(requests, latest):
+    """Process side: (request id, request fields, should_stop) of each request still current when picked up.
+
+    Stops when close() sends None. should_stop() turns true once a newer
+    request or a cancel() supersedes the request.
+    """
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        request_id, *fields = request
+        if latest.value != request_id:
+            continue  # Superseded before it started
+        yield request_id, fields, lambda request_id=request_id: latest.value != request_id
+
+
+class BackgroundWorker:
+    """Process plumbing shared by the AI, analysis and mate finder workers.
+
+    The process runs target(rows, columns, connect, requests, results,
+    latest, *args), usually a loop over serve(). send() hands it a request
+    and returns at once; each request gets a new id, and the shared latest
+    id tells the process which request is still worth finishing. The game
+    loop drains the results once per frame, so it never waits on the process.
+    """
+
+    name = 'worker'  # Named in WorkerDied messages
+
+    def __init__(self, target, rows, columns, connect, *args):
+        context = multiprocessing.get_context('spawn')  # Fresh interpreter: no pygame or SDL state
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        self.latest = context.Value('i', 0)  # Id of the only request worth finishing
+        self.process = context.Process(target=target,
+                                       args=(rows, columns, connect, self.requests, self.results, self.latest) + args,
+                                       daemon=True)
+        self.process.start()
+        self.request_id = 0
+
+    def send(self, *request):
+        self.request_id += 1
+        self.latest.value = self.request_id  # Also abandons whatever the process was doing
+        self.requests.put((self.request_id,) + request)
+
+    def cancel(self):
+        # Bumping the id makes the process abandon the current request at its next check
+        self.request_id += 1
+        self.latest.value = self.request_id
+
+    def drain(self):
+        """Results sent so far, oldest first, without waiting; raises WorkerDied after them if the process is gone."""
+        while True:
+            try:
+                yield self.results.get_nowait()
+            except queue.Empty:
+                check_alive(self.process, self.name)
+                return
+
+    def close(self):
+        self.cancel()
+        self.requests.put(None)
+        self.process.join(timeout=1)
@@ -0,0 +1,78 @@
+import numpy as np
+from .Rules import DIRECTIONS
+
+# Cell codes for (N, rows, cols) int8 board arrays; row 0 is the top row like CustomBoard.grid
+EMPTY = 0
+PLAYER_CODES = {'Imperial': 1, 'Rebel': 2}
+
+
+def boards_from_bitboards(bitboards):
+    """Stack BitBoard instances into an (N, rows, cols) int8 array."""
+    first = bitboards[0]
+    masks = {player: [bb.masks[player] for bb in bitboards] for player in PLAYER_CODES}
+    return boards_from_masks(first.rows, first.columns, masks)
+
+
+def boards_from_positions(positions):
+    """Stack Position snapshots into an (N, rows, cols) int8 array."""
+    first = positions[0]
+    masks = {'Imperial': [p.imperial for p in positions], 'Rebel': [p.rebel for p in positions]}
+    return boards_from_masks(first.rows, first.columns, masks)
+
+
+def boards_from_masks(rows, columns, masks):
+    """(N, rows, cols) int8 array from per-player lists of masks in the BitBoard layout."""
+    stride = rows + 1
+    column_mask = (1 << rows) - 1
+    # Grid row r holds the cell rows - 1 - r places above the bottom
+    heights = np.arange(rows - 1, -1, -1, dtype=np.uint64)
+    boards = np.zeros((len(masks['Imperial']), rows, columns), dtype=np.int8)
+    for player, code in PLAYER_CODES.items():
+        # Split masks per column so boards of any size fit in uint64
+        columns_bits = np.array([[(mask >> (c * stride)) & column_mask for c in range(columns)]
+                                 for mask in masks[player]], dtype=np.uint64)
+        bits = (columns_bits[:, None, :] >> heights[None, :, None]) & np.uint64(1)
+        boards[bits == 1] = code
+    return boards
+
+
+def has_line(boards, code, connect=4):
+    """Boolean array of length N: does player `code` have `connect` in a row?"""
+    hits = boards == code
+    rows, columns = boards.shape[1:]
+    found = np.zeros(len(boards), dtype=bool)
+    for d_row, d_col in DIRECTIONS:
+        row_span = (connect - 1) * d_row
+        col_span = (connect - 1) * abs(d_col)
+        if row_span >= rows or col_span >= columns:
+            continue  # The board is too small for a line in this direction
+        # AND together `connect` shifted views, one per step along the line
+        line = None
+        for k in range(connect):
+            r0 = k * d_row
+            c0 = k * d_col if d_col >= 0 else col_span + k * d_col
+            window = hits[:, r0:r0 + rows - row_span, c0:c0 + columns - col_span]
+            line = window if line is None else line & window
+        found |= line.any(axis=(1, 2))
+    return found
+
+
+def batch_outcomes(boards, connect=None):
+    """Classify many positions at once.
+
+    boards is an (N, rows, cols) int8 array using PLAYER_CODES, or a sequence
+    of BitBoard instances. connect defaults to the bitboards' own setting, or
+    four for arrays. Returns (winner, draw, in_progress) arrays where winner
+    holds the code of the winning player or EMPTY.
+    """
+    if not isinstance(boards, np.ndarray):
+        connect = connect or boards[0].connect
+        boards = boards_from_bitboards(boards)
+    connect = connect or 4
+    winner = np.full(len(boards), EMPTY, dtype=np.int8)
+    for code in PLAYER_CODES.values():
+        winner[(winner == EMPTY) & has_line(boards, code, connect)] = code
+    full = (boards[:, 0, :] != EMPTY).all(axis=1)  # Top row filled everywhere
+    draw = full & (winner == EMPTY)
+    in_progress = ~full & (winner == EMPTY)
+    return winner, draw, in_progress
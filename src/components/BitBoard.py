@@ -0,0 +1,147 @@
+from .Rules import get_rules
+
+
+class BitBoard:
+    """Bitboard position with one integer mask per faction plus a height mask.
+
+    Cells are stored column by column, bottom to top, with one spare bit above
+    every column so that shifted line checks never wrap into the next column.
+    Grid coordinates follow the UI grid: row 0 is the top row.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, players=('Imperial', 'Rebel')):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.rules = get_rules(rows, columns, connect)  # Shared winning-line tables
+        self.stride = rows + 1  # Bits per column, including the spare top bit
+        self.masks = {player: 0 for player in players}  # One mask per faction
+        self.slots = {player: slot for slot, player in enumerate(players)}  # Zobrist key set per faction
+        self.hash = 0  # Zobrist hash of the pieces and side to move, updated incrementally
+        self.occupied = 0  # Height mask: every filled cell
+        self.heights = [0] * columns  # Pieces per column, for O(1) landing rows
+        self.legal = (1 << columns) - 1  # Bit c is set while column c has room
+        # Per-line piece counts for each faction, and how many lines each faction
+        # holds k pieces of with no opposing piece ("open" lines), for O(1) evaluation
+        self.line_counts = [[0] * len(self.rules.lines) for _ in players]
+        self.open_lines = [[len(self.rules.lines)] + [0] * connect for _ in players]
+
+    def bit(self, row, column):
+        # Single-bit mask for a grid cell (row 0 is the top of the board)
+        return 1 << (column * self.stride + self.rows - 1 - row)
+
+    def column_mask(self, column):
+        return ((1 << self.rows) - 1) << (column * self.stride)
+
+    def can_play(self, column):
+        return 0 <= column < self.columns and self.legal >> column & 1 == 1
+
+    def legal_moves(self):
+        """Bitmask of playable columns: bit c is set if column c is not full."""
+        return self.legal
+
+    def landing_row(self, column):
+        """Grid row a piece dropped in column would land on."""
+        return self.rows - 1 - self.heights[column]
+
+    def play(self, column, player):
+        """Drop a piece for player in column and return the grid row it lands on."""
+        height = self.heights[column]
+        index = column * self.stride + height
+        slot = self.slots[player]
+        self.occupied |= 1 << index
+        self.masks[player] |= 1 << index
+        self.hash ^= self.rules.zobrist[slot][index] ^ self.rules.zobrist_side
+        self.heights[column] = height + 1
+        if height + 1 == self.rows:
+            self.legal &= ~(1 << column)  # Column is now full
+        own_counts, opp_counts = self.line_counts[slot], self.line_counts[1 - slot]
+        own_open, opp_open = self.open_lines[slot], self.open_lines[1 - slot]
+        for line in self.rules.lines_through[index]:
+            own, opp = own_counts[line], opp_counts[line]
+            if opp == 0:
+                own_open[own] -= 1
+                own_open[own + 1] += 1
+            if own == 0:
+                opp_open[opp] -= 1  # The opponent can no longer complete this line
+            own_counts[line] = own + 1
+        return self.rows - 1 - height
+
+    def unplay(self, column, player):
+        """Take back player's top piece in column and return the grid row it left."""
+        height = self.heights[column] - 1
+        index = column * self.stride + height
+        slot = self.slots[player]
+        self.occupied ^= 1 << index
+        self.masks[player] ^= 1 << index
+        self.hash ^= self.rules.zobrist[slot][index] ^ self.rules.zobrist_side
+        self.heights[column] = height
+        self.legal |= 1 << column
+        own_counts, opp_counts = self.line_counts[slot], self.line_counts[1 - slot]
+        own_open, opp_open = self.open_lines[slot], self.open_lines[1 - slot]
+        for line in self.rules.lines_through[index]:
+            own, opp = own_counts[line] - 1, opp_counts[line]
+            if opp == 0:
+                own_open[own + 1] -= 1
+                own_open[own] += 1
+            if own == 0:
+                opp_open[opp] += 1
+            own_counts[line] = own
+        return self.rows - 1 - height
+
+    def score(self, player):
+        """Heuristic from player's point of view: open lines weighted by pieces in them."""
+        own_open, opp_open = self.open_lines[self.slots[player]], self.open_lines[1 - self.slots[player]]
+        return sum(4 ** (k - 1) * (own_open[k] - opp_open[k]) for k in range(2, self.connect))
+
+    def winning_moves(self, player):
+        """Columns where player would complete a line right now."""
+        slot = self.slots[player]
+        if self.open_lines[slot][self.connect - 1] == 0:
+            return []  # No line is one piece short, so nothing to look up
+        own_counts, opp_counts = self.line_counts[slot], self.line_counts[1 - slot]
+        moves = []
+        for column in range(self.columns):
+            if not self.legal >> column & 1:
+                continue
+            index = column * self.stride + self.heights[column]
+            for line in self.rules.lines_through[index]:
+                if own_counts[line] == self.connect - 1 and opp_counts[line] == 0:
+                    moves.append(column)
+                    break
+        return moves
+
+    def player_at(self, row, column):
+        bit = self.bit(row, column)
+        for player, mask in self.masks.items():
+            if mask & bit:
+                return player
+        return None
+
+    def is_winner(self, player):
+        """Check `connect` in a row for player with shift-and-AND tests."""
+        mask = self.masks[player]
+        # Vertical, horizontal, and the two diagonals
+        for shift in (1, self.stride, self.stride + 1, self.stride - 1):
+            line = mask
+            for k in range(1, self.connect):
+                line &= mask >> (k * shift)
+            if line:
+                return True
+        return False
+
+    def is_full(self):
+        return self.legal == 0
+
+    def check_last_move(self, row, column, player):
+        """Check only the winning lines through the cell just filled.
+
+        Returns (won, cells) where cells lists the grid cells of the winning line(s).
+        """
+        mask = self.masks[player]
+        cells = set()
+        for index in self.rules.lines_through[self.rules.bit_index(row, column)]:
+            line = self.rules.lines[index]
+            if mask & line == line:
+                cells.update(self.rules.line_cells[index])
+        return bool(cells), sorted(cells)
@@ -1,15 +1,21 @@
 import pygame
 from .Piece import Piece
+from .GameState import GameState
 
 class Board:
     def __init__(self, game):
         self.game = game
         self.rows = 6
         self.columns = 7
-        self.grid = [[None for _ in range(self.columns)] for _ in range(self.rows)]
-        self.current_player = 'Imperial'  # or 'Rebel'
+        self.connect = 4  # Pieces in a row needed to win
+        self.state = GameState(self.rows, self.columns, self.connect)  # Rules and turn state
+        self.grid = [[None for _ in range(self.columns)] for _ in range(self.rows)]  # Piece sprites
         self.cell_size = 100  # Size of each cell
 
+    @property
+    def current_player(self):
+        return self.state.current_player
+
     def draw(self):
         # Calculate the starting position to center the board
         start_x = (self.game.width - (self.columns * self.cell_size)) // 2
@@ -28,15 +34,16 @@ class Board:
                     self.game.screen.blit(piece_image, (start_x + c * self.cell_size + 10, start_y + r * self.cell_size + 10))  # Draw the piece
 
     def drop_piece(self, column):
-        for r in range(self.rows - 1, -1, -1):  # Start from the bottom row
-            if self.grid[r][column] is None:  # Check if the cell is empty
-                self.grid[r][column] = Piece(self.current_player)  # Create a new Piece instance
-                self.play_sound()
-                # Check for a winner after placing the piece
-                if self.check_winner(self.current_player):  # Pass the current player to check for a win
-                    self.game.show_victory(self.current_player)
-                self.current_player = 'Rebel' if self.current_player == 'Imperial' else 'Imperial'
-                break
+        if not self.state.can_drop(column):  # Column is full or off the board
+            return
+        player = self.current_player
+        self.play_sound()
+        row = self.state.drop(column)
+        self.grid[row][column] = Piece(player)  # Create a new Piece instance
+        if self.state.winner is not None:
+            self.game.show_victory(self.state.winner)
+        elif self.state.is_draw():
+            self.game.show_draw()
 
     def play_sound(self):
         sound_file = "assets/sounds/tie_fighter.mp3" if self.current_player == 'Imperial' else "assets/sounds/x_wing.mp3"
@@ -45,64 +52,8 @@ class Board:
         sound.play()
 
     def check_winner(self, color):
-        """Check if there is a winner with four in a row."""
-        return (self.check_rows(color) or
-                self.check_columns(color) or
-                self.check_right_diagonal(color) or
-                self.check_left_diagonal(color))
-
-    def check_rows(self, color):
-        for r in range(self.rows):
-            for c in range(self.columns - 3):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r][c + 1] is not None and
-                    self.grid[r][c + 1].player == color and
-                    self.grid[r][c + 2] is not None and
-                    self.grid[r][c + 2].player == color and
-                    self.grid[r][c + 3] is not None and
-                    self.grid[r][c + 3].player == color):
-                    return True
-        return False
-
-    def check_columns(self, color):
-        for c in range(self.columns):
-            for r in range(self.rows - 3):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r + 1][c] is not None and
-                    self.grid[r + 1][c].player == color and
-                    self.grid[r + 2][c] is not None and
-                    self.grid[r + 2][c].player == color and
-                    self.grid[r + 3][c] is not None and
-                    self.grid[r + 3][c].player == color):
-                    return True
-        return False
-
-    def check_right_diagonal(self, color):
-        for c in range(self.columns - 3):
-            for r in range(self.rows - 1, 2, -1):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r - 1][c + 1] is not None and
-                    self.grid[r - 1][c + 1].player == color and
-                    self.grid[r - 2][c + 2] is not None and
-                    self.grid[r - 2][c + 2].player == color and
-                    self.grid[r - 3][c + 3] is not None and
-                    self.grid[r - 3][c + 3].player == color):
-                    return True
-        return False
+        """Check if there is a winner with `connect` in a row."""
+        return self.state.bitboard.is_winner(color)
 
-    def check_left_diagonal(self, color):
-        for c in range(self.columns - 1, 2, -1):
-            for r in range(self.rows - 1, 2, -1):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r - 1][c - 1] is not None and
-                    self.grid[r - 1][c - 1].player == color and
-                    self.grid[r - 2][c - 2] is not None and
-                    self.grid[r - 2][c - 2].player == color and
-                    self.grid[r - 3][c - 3] is not None and
-                    self.grid[r - 3][c - 3].player == color):
-                    return True
-        return False
+    def is_full(self):
+        return self.state.bitboard.is_full()
@@ -1,5 +1,7 @@
 import pygame
 from .Piece import Piece
+from .GameState import GameState
+from .AnalysisWorker import format_score
 import math
 
 class CustomBoard:
@@ -7,26 +9,42 @@ class CustomBoard:
         self.game = game
         self.rows = 6
         self.columns = 7
+        self.connect = 4  # Pieces in a row needed to win
         self.cell_size = 80  # Size of each cell
         self.board_texture = pygame.image.load("/workspaces/Connect-Four-Star-Wars/assets/textures/metal_texture.png").convert_alpha()  # Load metal texture
         self.border_color = (100, 100, 100)  # Dark gray for a metallic look
         self.border_thickness = 8  # Thickness of the border
         self.glow_color_rebel = (0, 0, 255)  # Blue glow for Rebel
         self.glow_color_imperial = (255, 0, 0)  # Red glow for Imperial
+        self.glow_color_winner = (255, 215, 0)  # Gold glow for the winning line
         self.glow_intensity = 0  # For animated glow effect
         self.glow_direction = 1  # For increasing/decreasing glow intensity
 
         # Load Star Wars font
         self.font = pygame.font.Font("/workspaces/Connect-Four-Star-Wars/assets/fonts/Starjedi.ttf", 24)  # Adjust the path as necessary
+        self.stats_font = pygame.font.Font(None, 20)  # Small default font for the debug overlay
 
-        # Initialize the grid for the pieces
-        self.grid = [[None for _ in range(self.columns)] for _ in range(self.rows)]
-        self.current_player = 'Imperial'  # Start with Imperial
+        # Rules and turn state live in a pygame-free GameState; this class only renders it
+        self.state = GameState(self.rows, self.columns, self.connect)  # Imperial starts
+        self.grid = [[None for _ in range(self.columns)] for _ in range(self.rows)]  # Piece sprites
 
         # Load Font Awesome icon images
         self.empire_icon = pygame.image.load("/workspaces/Connect-Four-Star-Wars/assets/font-awesome/icons/empire-icon.png").convert_alpha()
         self.rebel_icon = pygame.image.load("/workspaces/Connect-Four-Star-Wars/assets/font-awesome/icons/rebel-icon.png").convert_alpha()
 
+    @property
+    def current_player(self):
+        return self.state.current_player
+
+    @property
+    def winning_cells(self):
+        return self.state.winning_cells
+
+    def reset(self):
+        # Start a new game without reloading any assets
+        self.state.reset()
+        self.grid = [[None for _ in range(self.columns)] for _ in range(self.rows)]
+
     def draw(self):
         # Calculate the starting position to center the board
         start_x = (self.game.width - (self.columns * self.cell_size)) // 2
@@ -40,6 +58,8 @@ class CustomBoard:
                 # Draw the glow effect behind the square
                 if self.grid[r][c] is not None:  # Only draw glow if there's a piece
                     glow_color = self.glow_color_imperial if self.grid[r][c].player == 'Imperial' else self.glow_color_rebel
+                    if (r, c) in self.winning_cells:
+                        glow_color = self.glow_color_winner  # Highlight the winning line
                     self.draw_glow(start_x + c * self.cell_size, start_y + r * self.cell_size, glow_color)
 
                 # Draw the cell with 70% transparency
@@ -59,9 +79,52 @@ class CustomBoard:
         # Draw integrated display
         self.draw_display(start_x, start_y)
 
+        # Live analysis: the score of every column, from the point of view of the player to move
+        analysis = self.game.analysis
+        if self.game.show_analysis and analysis is not None and analysis.scores is not None:
+            self.draw_analysis(start_x, start_y, analysis)
+
+        # Debug overlay with the statistics of the last AI search
+        if self.game.show_ai_stats and self.game.ai_worker is not None and self.game.ai_worker.stats is not None:
+            self.draw_stats_overlay(self.game.ai_worker.stats)
+
         # Update glow intensity for animation
         self.update_glow()
 
+    def draw_analysis(self, start_x, start_y, analysis):
+        # One label per column on a dark strip above the board, the best column highlighted
+        y = start_y - 58
+        line_height = self.stats_font.get_linesize()
+        strip = pygame.Surface((self.columns * self.cell_size, line_height + 6), pygame.SRCALPHA)
+        strip.fill((0, 0, 0, 160))
+        self.game.screen.blit(strip, (start_x, y))
+        best = analysis.best_column()
+        for c, score in enumerate(analysis.scores):
+            if score is None:
+                continue  # Full column
+            if c == best:
+                color = (255, 215, 0)  # Gold, like the winning line
+            else:
+                color = (0, 255, 0) if score > 0 else (255, 80, 80) if score < 0 else (255, 255, 255)
+            label = self.stats_font.render(format_score(score), True, color)
+            x = start_x + c * self.cell_size + (self.cell_size - label.get_width()) // 2
+            self.game.screen.blit(label, (x, y + 3))
+        depth = self.stats_font.render(f"depth {analysis.depth}", True, (200, 200, 200))
+        depth_strip = pygame.Surface((depth.get_width() + 10, line_height + 6), pygame.SRCALPHA)
+        depth_strip.fill((0, 0, 0, 160))
+        depth_strip.blit(depth, (5, 3))
+        self.game.screen.blit(depth_strip, (start_x - depth_strip.get_width() - 10, y))
+
+    def draw_stats_overlay(self, stats):
+        # Plain text in the top-right corner, readable over any wallpaper
+        lines = stats.lines()
+        line_height = self.stats_font.get_linesize()
+        overlay = pygame.Surface((230, line_height * len(lines) + 10), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        for i, line in enumerate(lines):
+            overlay.blit(self.stats_font.render(line, True, (0, 255, 0)), (5, 5 + i * line_height))
+        self.game.screen.blit(overlay, (self.game.width - overlay.get_width() - 10, 10))
+
     def draw_display(self, start_x, start_y):
         # Draw a single integrated display for the turn
         display_width = 200  # Increased width to fit "Imperial"
@@ -168,15 +231,34 @@ class CustomBoard:
             self.glow_direction *= -1  # Reverse direction
 
     def drop_piece(self, column):
-        for r in range(self.rows - 1, -1, -1):  # Start from the bottom row
-            if self.grid[r][column] is None:  # Check if the cell is empty
-                self.grid[r][column] = Piece(self.current_player)  # Create a new Piece instance
-                self.play_sound()
-                # Check for a winner after placing the piece
-                if self.check_winner(self.current_player):  # Pass the current player to check for a win
-                    self.game.show_victory(self.current_player)
-                self.current_player = 'Rebel' if self.current_player == 'Imperial' else 'Imperial'
-                break
+        if not self.state.can_drop(column):  # Column is full or off the board
+            return
+        player = self.current_player
+        self.play_sound()
+        row = self.state.drop(column)
+        self.grid[row][column] = Piece(player)  # Create a new Piece instance
+        self.check_game_over()
+
+    def undo(self):
+        # Take back the last move using the GameState history stack
+        move = self.state.undo()
+        if move is not None:
+            row, column = move
+            self.grid[row][column] = None
+            self.game.game_over = False  # Taking back a move reopens a finished game
+
+    def redo(self):
+        move = self.state.redo()
+        if move is not None:
+            row, column = move
+            self.grid[row][column] = Piece(self.state.player_at(row, column))
+            self.check_game_over()
+
+    def check_game_over(self):
+        if self.state.winner is not None:
+            self.game.show_victory(self.state.winner)
+        elif self.state.is_draw():
+            self.game.show_draw()
 
     def play_sound(self):
         sound_file = "assets/sounds/tie_fighter.mp3" if self.current_player == 'Imperial' else "assets/sounds/x_wing.mp3"
@@ -185,64 +267,8 @@ class CustomBoard:
         sound.play()
 
     def check_winner(self, color):
-        """Check if there is a winner with four in a row."""
-        return (self.check_rows(color) or
-                self.check_columns(color) or
-                self.check_right_diagonal(color) or
-                self.check_left_diagonal(color))
+        """Check if there is a winner with `connect` in a row."""
+        return self.state.bitboard.is_winner(color)
 
-    def check_rows(self, color):
-        for r in range(self.rows):
-            for c in range(self.columns - 3):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r][c + 1] is not None and
-                    self.grid[r][c + 1].player == color and
-                    self.grid[r][c + 2] is not None and
-                    self.grid[r][c + 2].player == color and
-                    self.grid[r][c + 3] is not None and
-                    self.grid[r][c + 3].player == color):
-                    return True
-        return False
-
-    def check_columns(self, color):
-        for c in range(self.columns):
-            for r in range(self.rows - 3):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r + 1][c] is not None and
-                    self.grid[r + 1][c].player == color and
-                    self.grid[r + 2][c] is not None and
-                    self.grid[r + 2][c].player == color and
-                    self.grid[r + 3][c] is not None and
-                    self.grid[r + 3][c].player == color):
-                    return True
-        return False
-
-    def check_right_diagonal(self, color):
-        for c in range(self.columns - 3):
-            for r in range(self.rows - 1, 2, -1):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r - 1][c + 1] is not None and
-                    self.grid[r - 1][c + 1].player == color and
-                    self.grid[r - 2][c + 2] is not None and
-                    self.grid[r - 2][c + 2].player == color and
-                    self.grid[r - 3][c + 3] is not None and
-                    self.grid[r - 3][c + 3].player == color):
-                    return True
-        return False
-
-    def check_left_diagonal(self, color):
-        for c in range(self.columns - 1, 2, -1):
-            for r in range(self.rows - 1, 2, -1):
-                if (self.grid[r][c] is not None and
-                    self.grid[r][c].player == color and
-                    self.grid[r - 1][c - 1] is not None and
-                    self.grid[r - 1][c - 1].player == color and
-                    self.grid[r - 2][c - 2] is not None and
-                    self.grid[r - 2][c - 2].player == color and
-                    self.grid[r - 3][c - 3] is not None and
-                    self.grid[r - 3][c - 3].player == color):
-                    return True
-        return False
+    def is_full(self):
+        return self.state.bitboard.is_full()
@@ -7,6 +7,11 @@ import glob
 from .Board import Board  # Comment this out if not using
 from .VictoryScreen import VictoryScreen
 from .CustomBoard import CustomBoard  # Import the CustomBoard
+from .AIWorker import AIWorker, HEURISTIC, PERFECT, MONTE_CARLO
+from .BackgroundWorker import WorkerDied
+from .AnalysisWorker import AnalysisWorker
+from .GameReview import GameReviewer
+from .MateWorker import MateWorker
 
 class Game:
     def __init__(self):
@@ -38,6 +43,22 @@ class Game:
         self.custom_board = CustomBoard(self)  # Ensure this is correctly initialized
         print("Custom board initialized.")
         
+        # Computer opponent: None for two humans, otherwise the faction the AI plays
+        self.ai_player = None
+        self.ai_level = HEURISTIC  # Or PERFECT: solve the position exactly when possible
+        self.ai_time_budget = 1.0  # Seconds of thinking per AI move
+        self.ai_worker = None  # Background search process, started when first needed
+        self.opening_book_path = "/workspaces/Connect-Four-Star-Wars/assets/books/opening_book.bin"  # Built by src/build_book.py; optional
+        self.network_path = "/workspaces/Connect-Four-Star-Wars/assets/networks/policy_value.npz"  # Monte Carlo evaluator weights; optional
+        self.tablebase_dir = "/workspaces/Connect-Four-Star-Wars/assets/tablebases"  # Built by src/build_tablebase.py; optional
+        self.show_ai_stats = False  # Search statistics overlay, toggled with D
+        self.ai_stats_log = None  # Path of a JSON lines file to append the stats of every AI move to
+        self.show_analysis = False  # Per-column evaluations above the board, toggled with A
+        self.analysis = None  # Background analysis process, started when first needed
+        self.review_after_game = False  # Review every move once a game is won or drawn; R reviews on demand
+        self.reviewer = None  # Process pool for post-game reviews, started when first needed
+        self.mate_finder = None  # Background forced-win search, started with M
+
         # Initialize the running flag
         self.running = True
 
@@ -74,6 +95,26 @@ class Game:
         self.restart_button.set_image(pygame.Surface((button_width, button_height)))  # Create a surface for the button
         self.restart_button.image.fill((50, 50, 50))  # Fill the button with a dark gray color
 
+        # Undo/redo buttons on either side of the restart button
+        self.undo_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((self.width // 2 - button_width // 2 - button_width - padding, self.height - button_height - padding), (button_width, button_height)),
+                                                        text='Undo',
+                                                        manager=self.ui_manager)
+        self.redo_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((self.width // 2 + button_width // 2 + padding, self.height - button_height - padding), (button_width, button_height)),
+                                                        text='Redo',
+                                                        manager=self.ui_manager)
+
+        # Opponent selection in the top-left corner
+        self.opponent_options = {'Human vs Human': (None, HEURISTIC),
+                                 'AI plays Imperial': ('Imperial', HEURISTIC),
+                                 'AI plays Rebel': ('Rebel', HEURISTIC),
+                                 'Solver Imperial': ('Imperial', PERFECT),
+                                 'Solver Rebel': ('Rebel', PERFECT),
+                                 'Monte Carlo Imperial': ('Imperial', MONTE_CARLO),
+                                 'Monte Carlo Rebel': ('Rebel', MONTE_CARLO)}
+        self.opponent_menu = pygame_gui.elements.UIDropDownMenu(list(self.opponent_options), 'Human vs Human',
+                                                                pygame.Rect((padding, padding), (200, 30)),
+                                                                manager=self.ui_manager)
+
     def load_wallpapers(self, pattern):
         # Load all wallpaper images matching the pattern
         images = []
@@ -87,11 +128,23 @@ class Game:
         print("Starting the game loop...")
         while self.running:
             self.handle_events()
+            self.update_ai()  # Let the computer opponent move if it is its turn
+            self.update_analysis()  # Collect refined column scores without waiting
+            self.update_review()  # Print the post-game review once it is done
+            self.update_mate_finder()  # Print the forced-win answer once it is found
             self.draw_background()  # Draw the background wallpaper
             self.custom_board.draw()  # Draw the custom board
             self.ui_manager.update(self.clock.tick(60) / 1000.0)  # Update the UI manager
             self.ui_manager.draw_ui(self.screen)  # Draw the UI elements
             pygame.display.flip()     # Update the display
+        if self.ai_worker is not None:
+            self.ai_worker.close()
+        if self.analysis is not None:
+            self.analysis.close()
+        if self.reviewer is not None:
+            self.reviewer.close()
+        if self.mate_finder is not None:
+            self.mate_finder.close()
 
     def draw_background(self):
 
@@ -111,20 +164,161 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.key == pygame.K_z:
+                    self.undo()
+                elif event.key == pygame.K_y:
+                    self.redo()
+                elif event.key == pygame.K_d:
+                    self.show_ai_stats = not self.show_ai_stats
+                elif event.key == pygame.K_a:
+                    self.show_analysis = not self.show_analysis
+                elif event.key == pygame.K_r and self.game_over:
+                    self.start_review()
+                elif event.key == pygame.K_m:
+                    self.find_forced_win()
+            elif event.type == pygame_gui.UI_DROP_DOWN_MENU_CHANGED and event.ui_element == self.opponent_menu:
+                self.ai_player, self.ai_level = self.opponent_options[event.text]
+                if self.ai_worker is not None:
+                    self.ai_worker.cancel()  # Answers pondered for the old opponent no longer apply
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left mouse button
-                    if self.game_over:  # Check if the game is over
+                    if self.undo_button.rect.collidepoint(event.pos):
+                        self.undo()  # Also works after the game is over
+                    elif self.redo_button.rect.collidepoint(event.pos):
+                        self.redo()
+                    elif self.game_over:  # Check if the game is over
                         self.restart_game()  # Restart the game
                     else:
                         # Check if the restart button is clicked
                         if self.restart_button.rect.collidepoint(event.pos):
                             self.restart_game()  # Call the restart method
-                        else:
+                        elif self.ui_manager.get_hovering_any_element():
+                            pass  # The click belongs to another UI element, such as the opponent menu
+                        elif self.custom_board.current_player != self.ai_player:  # Ignore clicks during the AI's turn
                             # Calculate the column based on mouse position
                             column = (event.pos[0] - (self.width - (self.custom_board.columns * self.custom_board.cell_size)) // 2) // self.custom_board.cell_size
                             self.custom_board.drop_piece(column)  # Drop the piece in the selected column
             self.ui_manager.process_events(event)  # Process UI events
 
+    def find_forced_win(self):
+        # Mate finder: does the player to move have a forced win? The answer arrives in update_mate_finder
+        if self.mate_finder is None:
+            self.mate_finder = MateWorker(self.custom_board.rows, self.custom_board.columns, self.custom_board.connect)
+        if not self.custom_board.state.is_over():
+            self.mate_finder.start(self.custom_board.state.position())
+
+    def update_mate_finder(self):
+        try:
+            answer = self.mate_finder.poll() if self.mate_finder is not None else None
+        except WorkerDied as error:
+            print(error)
+            self.mate_finder.close()
+            self.mate_finder = None  # Started afresh by the next M
+            return
+        if answer is None:
+            return
+        position, result, column = answer
+        if position != self.custom_board.state.position():
+            return  # The board moved on while the search ran
+        player = position.current_player
+        if result is None:
+            print(f"No forced win for {player} found within the time limit.")
+        elif result:
+            print(f"{player} has a forced win: play column {column + 1}.")
+        else:
+            print(f"{player} has no forced win.")
+
+    def update_ai(self):
+        # Called every frame; the search itself runs in the worker process
+        if self.ai_player is None or self.game_over:
+            if self.ai_worker is not None and (self.ai_worker.thinking or self.ai_worker.pondering):
+                self.ai_worker.cancel()
+            return
+        if self.ai_worker is None:
+            self.ai_worker = AIWorker(self.custom_board.rows, self.custom_board.columns, self.custom_board.connect,
+                                      self.opening_book_path, self.network_path, self.tablebase_dir)
+        position = self.custom_board.state.position()
+        try:
+            if self.custom_board.current_player != self.ai_player:
+                # Human's turn: think about the likely replies meanwhile
+                if not self.ai_worker.pondering or self.ai_worker.position != position:
+                    self.ai_worker.ponder(position, self.ai_time_budget, level=self.ai_level)  # Restarts after undo/restart
+                self.ai_worker.poll()
+                return
+            if not self.ai_worker.thinking or self.ai_worker.position != position:
+                self.ai_worker.start(position, self.ai_time_budget, level=self.ai_level)  # Also replaces a search made stale by undo/restart
+                return
+            column = self.ai_worker.poll()
+        except WorkerDied as error:
+            print(f"{error} Switching the computer opponent off.")
+            self.ai_worker.close()
+            self.ai_worker = None
+            self.ai_player = None  # Keep the game playable by two humans rather than wait forever
+            rect = self.opponent_menu.relative_rect
+            self.opponent_menu.kill()  # Show the change; picking an AI again starts a fresh worker
+            self.opponent_menu = pygame_gui.elements.UIDropDownMenu(list(self.opponent_options), 'Human vs Human', rect,
+                                                                    manager=self.ui_manager)
+            return
+        if column is not None:
+            if self.ai_stats_log and self.ai_worker.stats is not None:
+                self.ai_worker.stats.log(self.ai_stats_log, move=len(self.custom_board.state.history), column=column)
+            self.custom_board.drop_piece(column)
+
+    def update_analysis(self):
+        # Called every frame; the analysis runs in its own process and only hands back finished depths
+        if not self.show_analysis or self.game_over:
+            if self.analysis is not None and self.analysis.position is not None:
+                self.analysis.cancel()
+            return
+        if self.analysis is None:
+            self.analysis = AnalysisWorker(self.custom_board.rows, self.custom_board.columns, self.custom_board.connect,
+                                           self.tablebase_dir)
+        position = self.custom_board.state.position()
+        if self.analysis.position != position:
+            self.analysis.start(position)  # A move, undo or restart: analyse the new position
+        try:
+            self.analysis.poll()
+        except WorkerDied as error:
+            print(f"{error} Analysis switched off.")
+            self.analysis.close()
+            self.analysis = None
+            self.show_analysis = False  # A turns it back on with a fresh process
+
+    def start_review(self):
+        # Evaluate every move of the finished game in parallel; the frame loop keeps running meanwhile
+        if self.reviewer is None:
+            self.reviewer = GameReviewer(self.custom_board.rows, self.custom_board.columns, self.custom_board.connect,
+                                         book_path=self.opening_book_path, tablebase_dir=self.tablebase_dir)
+        if not self.reviewer.running:
+            print(f"Reviewing {len(self.custom_board.state.history)} moves...")
+            self.reviewer.start(list(self.custom_board.state.history))
+
+    def update_review(self):
+        try:
+            reviews = self.reviewer.poll() if self.reviewer is not None else None
+        except WorkerDied as error:
+            print(error)
+            self.reviewer.close()
+            self.reviewer = None  # R starts a fresh pool
+            return
+        if reviews is None:
+            return
+        flagged = [review for review in reviews if review.changed_result or review.sharp_drop]
+        for review in flagged:
+            print(review.describe())
+        print(f"Review done: {len(flagged)} of {len(reviews)} moves flagged.")
+
+    def undo(self):
+        self.custom_board.undo()
+        # Against the computer, also take back its reply so it is the human's turn again
+        if self.custom_board.current_player == self.ai_player and self.custom_board.state.history:
+            self.custom_board.undo()
+
+    def redo(self):
+        self.custom_board.redo()
+        if self.custom_board.current_player == self.ai_player:
+            self.custom_board.redo()
+
     def show_victory(self, winner):
         self.game_over = True  # Set game over state
         # Load the appropriate icon based on the winner
@@ -157,14 +351,25 @@ class Game:
         self.screen.blit(victory_surface, text_rect)  # Draw the victory text
 
         pygame.display.flip()
+        if self.review_after_game:
+            self.start_review()  # Runs on the pool while the victory screen is shown
         pygame.time.wait(3000)  # Wait for 3 seconds before returning to the main menu
 
+    def show_draw(self):
+        self.game_over = True  # Draw: no moves left
+        if self.review_after_game:
+            self.start_review()
+
     def __del__(self):
         # Remove the line that tries to release background_video if it's not defined
         pass
 
     def restart_game(self):
+        if self.ai_worker is not None:
+            self.ai_worker.cancel()  # Drop any search or pondering of the old game
+        if self.reviewer is not None:
+            self.reviewer.cancel()  # Its verdicts would be printed over the new game
         # Reset the game state
-        self.custom_board = CustomBoard(self)  # Reinitialize the custom board
+        self.custom_board.reset()  # Reuse the loaded board assets
         self.current_player = 'Imperial'  # Reset to the starting player
         self.game_over = False  # Reset game over state
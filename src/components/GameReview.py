@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import time
+from functools import lru_cache
+from .AIWorker import load_book, load_tablebases
+from .BackgroundWorker import WorkerDied
+from .GameState import GameState
+from .Search import Search, SearchTimeout, TABLEBASE_WIN
+from .Solver import Solver, outcome
+
+REVIEW_TIME = 1.0  # Seconds per ply for the exact solver, and again for the fallback search
+SHARP_DROP = 3  # Heuristic score lost by a move that counts as a sharp drop
+
+
+@lru_cache(maxsize=None)
+def engines(rows, columns, connect, book_path, tablebase_dir):
+    # One solver and one heuristic search per board shape and pool process, reused for every ply
+    solver = Solver(rows, columns, connect, book=load_book(book_path, rows, columns, connect))
+    search = Search(rows, columns, connect)
+    search.tablebase = solver.tablebase = load_tablebases(tablebase_dir, rows, columns, connect)
+    return solver, search
+
+
+def heuristic_outcome(score):
+    # 'win' or 'loss' when the heuristic search found a forced result, counted or from a tablebase, else None
+    if abs(score) >= TABLEBASE_WIN:
+        return 'win' if score > 0 else 'loss'
+    return None
+
+
+class MoveReview:
+    """Verdict on one move of a finished game, from the point of view of the player who made it."""
+
+    def __init__(self, ply, player, column, scores, exact):
+        self.ply = ply  # 0 for the first move of the game
+        self.player = player
+        self.column = column
+        self.scores = scores  # Score of every column before the move; None for full columns
+        self.exact = exact  # Solver scores, or heuristic search scores when the solver ran out of time
+        playable = [c for c, score in enumerate(scores) if score is not None]
+        self.best_column = max(playable, key=lambda c: (scores[c], -abs(2 * c - (len(scores) - 1))))
+        self.best_score = scores[self.best_column]
+        self.score = scores[column]
+        if exact:
+            self.result_before, self.result_after = outcome(self.best_score), outcome(self.score)
+        else:
+            self.result_before, self.result_after = heuristic_outcome(self.best_score), heuristic_outcome(self.score)
+
+    @property
+    def changed_result(self):
+        """True if the move threw away a win or a draw that was there before."""
+        if self.exact:
+            return self.result_after != self.result_before
+        # The heuristic search only knows results it has proven
+        return self.result_after != self.result_before and (self.result_before == 'win' or self.result_after == 'loss')
+
+    @property
+    def sharp_drop(self):
+        """True if the move lost a lot of heuristic score without a proven change of result."""
+        if self.exact or self.changed_result or self.result_before is not None or self.result_after is not None:
+            return False
+        return self.best_score - self.score >= SHARP_DROP
+
+    def describe(self):
+        move = f"{self.ply + 1}. {self.player} column {self.column + 1}"
+        if self.changed_result:
+            before, after = self.result_before or 'an unclear position', self.result_after or 'an unclear position'
+            return f"{move}: blunder, turns {before} into {after} (column {self.best_column + 1} was best)"
+        if self.sharp_drop:
+            return f"{move}: sharp drop from {self.best_score:+d} to {self.score:+d} (column {self.best_column + 1} was best)"
+        return f"{move}: ok"
+
+
+def review_ply(task):
+    """MoveReview of one move.
+
+    task is (rows, columns, connect, moves before it, column played, time
+    limit, book path, tablebase directory).
+    """
+    rows, columns, connect, history, column, time_limit, book_path, tablebase_dir = task
+    solver, search = engines(rows, columns, connect, book_path, tablebase_dir)
+    state = GameState(rows, columns, connect)
+    for played in history:
+        state.make_move(played)
+    position = state.position()
+    solver.deadline = time.monotonic() + time_limit
+    try:
+        return MoveReview(len(history), position.current_player, column, solver.analyze(position), True)
+    except SearchTimeout:
+        pass  # Too early in the game to solve in time
+    finally:
+        solver.deadline = None
+    deadline = time.monotonic() + time_limit
+    scores = search.column_scores(position, lambda depth, scores: None, should_stop=lambda: time.monotonic() > deadline)
+    return MoveReview(len(history), position.current_player, column, scores, False)
+
+
+def review_tasks(rows, columns, connect, moves, time_limit, book_path, tablebase_dir):
+    # One review_ply task per move in moves (0-based columns)
+    return [(rows, columns, connect, tuple(moves[:ply]), column, time_limit, book_path, tablebase_dir)
+            for ply, column in enumerate(moves)]
+
+
+def review_game(rows, columns, connect, moves, time_limit=REVIEW_TIME, workers=None, book_path=None,
+                tablebase_dir=None):
+    """MoveReview of every move in moves (0-based columns), each ply on its own pool process."""
+    tasks = review_tasks(rows, columns, connect, moves, time_limit, book_path, tablebase_dir)
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(tasks) < 2:
+        return [review_ply(task) for task in tasks]
+    with multiprocessing.get_context('spawn').Pool(min(workers, len(tasks))) as pool:
+        return pool.map(review_ply, tasks, chunksize=1)  # Early plies take longest, so hand out one at a time
+
+
+class GameReviewer:
+    """Reviews a finished game on a process pool without blocking the render loop.
+
+    start() hands every ply to the pool and returns at once; poll() returns
+    the list of MoveReview once all of them are done, and None until then.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, time_limit=REVIEW_TIME, workers=None, book_path=None,
+                 tablebase_dir=None):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.time_limit = time_limit
+        self.workers = workers or os.cpu_count()
+        self.book_path = book_path
+        self.tablebase_dir = tablebase_dir
+        self.pool = None
+        self.pending = None  # AsyncResult of the review in progress
+
+    def start(self, moves):
+        if self.pool is None:
+            self.pool = multiprocessing.get_context('spawn').Pool(self.workers)
+        tasks = review_tasks(self.rows, self.columns, self.connect, moves, self.time_limit, self.book_path,
+                             self.tablebase_dir)
+        self.pending = self.pool.map_async(review_ply, tasks, chunksize=1)
+
+    @property
+    def running(self):
+        return self.pending is not None
+
+    def poll(self):
+        """Return the list of MoveReview once the review is done; raises WorkerDied if it failed."""
+        if self.pending is None or not self.pending.ready():
+            return None
+        try:
+            reviews = self.pending.get()
+        except Exception as error:
+            self.close()  # The pool may be left half broken; the next start() makes a new one
+            raise WorkerDied(f"The review failed: {error!r}.") from error
+        self.pending = None
+        return reviews
+
+    def cancel(self):
+        # A map_async cannot be withdrawn from the pool, so stop the pool; start() makes a new one
+        if self.pending is not None:
+            self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()  # Do not wait for a review nobody will read
+            self.pool.join()
+            self.pool = None
+        self.pending = None
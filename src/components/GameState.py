@@ -0,0 +1,123 @@
+from .BitBoard import BitBoard
+from .Position import Position
+
+
+class GameState:
+    """Rules and turn state of one game, with no pygame dependency.
+
+    CustomBoard renders a GameState; simulations and worker processes can
+    use it directly without initializing SDL or loading any assets.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.reset()
+
+    @classmethod
+    def from_moves(cls, moves, rows=6, columns=7, connect=4):
+        """Game after moves, given as 1-based column digits such as "4453".
+
+        Raises ValueError if a character is not a column digit, a column is
+        full or off the board, or the game is over after any of the moves.
+        """
+        state = cls(rows, columns, connect)
+        for digit in moves:
+            if digit not in '123456789' or state.drop(int(digit) - 1) is None or state.is_over():
+                raise ValueError(f"Illegal or game-ending move sequence: {moves}")
+        return state
+
+    def reset(self):
+        self.bitboard = BitBoard(self.rows, self.columns, self.connect)
+        self.current_player = 'Imperial'  # Always first: Position and the engines derive the side to move from it
+        self.winner = None
+        self.winning_cells = []  # Cells of the winning line, for highlighting
+        self.history = []  # Columns played, oldest first
+        self.redo_stack = []  # Columns taken back by undo(), most recent last
+
+    def other_player(self, player):
+        return 'Rebel' if player == 'Imperial' else 'Imperial'
+
+    def can_drop(self, column):
+        return self.winner is None and self.bitboard.can_play(column)
+
+    def drop(self, column):
+        """Drop a piece for the current player and return the row it lands on.
+
+        Returns None if the column is full, off the board, or the game is over.
+        A new move discards any moves that could have been redone.
+        """
+        if not self.can_drop(column):
+            return None
+        self.redo_stack.clear()
+        return self.make_move(column)
+
+    def make_move(self, column):
+        """Play column for the current player without any legality checks."""
+        player = self.current_player
+        row = self.bitboard.play(column, player)
+        self.history.append(column)
+        # Only the lines through the new piece can have changed
+        won, cells = self.bitboard.check_last_move(row, column, player)
+        if won:
+            self.winner = player
+            self.winning_cells = cells
+        self.current_player = self.other_player(player)
+        return row
+
+    def unmake_move(self):
+        """Take back the last move in O(1) and return its (row, column)."""
+        column = self.history.pop()
+        player = self.other_player(self.current_player)
+        row = self.bitboard.unplay(column, player)
+        # Play stops at the first win, so only the last move can have won
+        self.winner = None
+        self.winning_cells = []
+        self.current_player = player
+        return row, column
+
+    def undo(self):
+        """Take back the last move so it can be redone; returns (row, column) or None."""
+        if not self.history:
+            return None
+        row, column = self.unmake_move()
+        self.redo_stack.append(column)
+        return row, column
+
+    def redo(self):
+        """Replay the last undone move; returns (row, column) or None."""
+        if not self.redo_stack:
+            return None
+        column = self.redo_stack.pop()
+        return self.make_move(column), column
+
+    @property
+    def hash(self):
+        """64-bit Zobrist hash of the position, including side to move."""
+        return self.bitboard.hash
+
+    def evaluate(self):
+        """Heuristic score for the side to move, from the incremental line counters."""
+        return self.bitboard.score(self.current_player)
+
+    def winning_moves(self):
+        """Columns that win immediately for the side to move."""
+        return self.bitboard.winning_moves(self.current_player)
+
+    def must_block(self):
+        """Columns where the opponent threatens to win on their next move."""
+        return self.bitboard.winning_moves(self.other_player(self.current_player))
+
+    def position(self):
+        """Immutable, hashable snapshot of the current position."""
+        return Position.from_state(self)
+
+    def player_at(self, row, column):
+        return self.bitboard.player_at(row, column)
+
+    def is_draw(self):
+        return self.winner is None and self.bitboard.is_full()
+
+    def is_over(self):
+        return self.winner is not None or self.bitboard.is_full()
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import queue
+import time
+from .BackgroundWorker import check_alive
+from .Search import Search, SearchTimeout, WIN_SCORE
+from .TranspositionTable import SharedTranspositionTable
+
+HELPER_POLL = 0.5  # Seconds to wait for a helper's node count before checking that the helpers are still alive
+
+
+def run_helper(index, rows, columns, connect, table, requests, results, latest):
+    # Helper process: search the requested root over and over, only to fill the shared table
+    search = Search(rows, columns, connect, table)
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, position, time_limit, max_depth = request
+        search.nodes = 0
+        search.deadline = time.monotonic() + time_limit
+        search.should_stop = lambda: latest.value != request_id
+        current, mask = search.split(position)
+        max_depth = max_depth or rows * columns - position.moves
+        # Odd helpers run one ply ahead of the main search, and each tries the root moves in its own order
+        order = search.order[index % columns:] + search.order[:index % columns]
+        try:
+            for depth in range(1 + index % 2, max_depth + 1):
+                search.root(current, mask, depth, -WIN_SCORE - 1, WIN_SCORE + 1, order)
+        except SearchTimeout:
+            pass
+        results.put((request_id, search.nodes))
+
+
+class LazySMP:
+    """Parallel alpha-beta search: helper processes share one transposition table.
+
+    Every helper searches the same root as the main search, at staggered
+    depths and with different root move orders, and stores what it finds
+    in a SharedTranspositionTable. The main search, which runs in the
+    calling process, keeps hitting those entries and completes each depth
+    sooner. Processes rather than threads, because the GIL would serialize
+    threads.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, workers=None, megabytes=64):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.workers = workers or os.cpu_count()  # Including the main search
+        self.table = SharedTranspositionTable(megabytes)
+        self.search = Search(rows, columns, connect, self.table)
+        context = multiprocessing.get_context('spawn')
+        self.requests = [context.Queue() for _ in range(self.workers - 1)]
+        self.results = context.Queue()
+        self.latest = context.Value('i', 0)
+        self.helpers = [context.Process(target=run_helper,
+                                        args=(index, rows, columns, connect, self.table, requests,
+                                              self.results, self.latest),
+                                        daemon=True)
+                        for index, requests in enumerate(self.requests, 1)]
+        for helper in self.helpers:
+            helper.start()
+        self.request_id = 0
+        self.nodes = 0  # Nodes searched by all processes in the last search
+
+    def iterative_deepening(self, position, time_limit, max_depth=None, report=None):
+        """Same as Search.iterative_deepening, with the helpers searching alongside.
+
+        Raises WorkerDied if a helper process is gone.
+        """
+        self.request_id += 1
+        self.latest.value = self.request_id
+        for requests in self.requests:
+            requests.put((self.request_id, position, time_limit, max_depth))
+        try:
+            result = self.search.iterative_deepening(position, time_limit, max_depth, report)
+        finally:
+            self.latest.value = self.request_id + 1  # Stop the helpers
+            self.nodes = self.search.nodes
+            pending = len(self.helpers)
+            while pending:
+                try:
+                    request_id, nodes = self.results.get(timeout=HELPER_POLL)
+                except queue.Empty:
+                    for helper in self.helpers:
+                        check_alive(helper, 'Lazy-SMP helper')
+                    continue
+                if request_id == self.request_id:
+                    self.nodes += nodes
+                    pending -= 1
+        return result
+
+    def close(self):
+        for requests in self.requests:
+            requests.put(None)
+        for helper in self.helpers:
+            helper.join(timeout=1)
+        self.table.close()
+        self.table.unlink()
+
+
+def speedup_report(position, depth, core_counts, megabytes=64):
+    """Time to finish depth with each number of cores, as (cores, seconds, nodes, speedup) rows.
+
+    A 1-core run always comes first, and every speedup is relative to it.
+    """
+    rows = []
+    for cores in [1] + [cores for cores in core_counts if cores != 1]:
+        smp = LazySMP(position.rows, position.columns, position.connect, cores, megabytes)
+        try:
+            started = time.monotonic()
+            smp.iterative_deepening(position, float('inf'), depth)
+            elapsed = time.monotonic() - started
+        finally:
+            smp.close()
+        rows.append((cores, elapsed, smp.nodes, rows[0][1] / elapsed if rows else 1.0))
+    return rows
@@ -0,0 +1,256 @@
+import math
+import multiprocessing
+import os
+import random
+from functools import lru_cache
+from .BatchRules import boards_from_masks
+from .Position import popcount
+from .Search import Search, SearchTimeout
+from .SearchStats import SearchStats
+
+
+@lru_cache(maxsize=None)
+def geometry(rows, columns, connect):
+    # One Search per board shape and process, used only for its bit masks and threats()
+    return Search(rows, columns, connect)
+
+
+def run_playout(task):
+    """Play one lightly guided random game; return its result for the side to move at the start.
+
+    task is (rows, columns, connect, current, mask, seed). Each side wins
+    immediately when it can and blocks a single immediate threat, and
+    otherwise plays a random column, so the result only depends on the seed.
+    """
+    rows, columns, connect, current, mask, seed = task
+    search = geometry(rows, columns, connect)
+    rng = random.Random(seed)
+    cells = rows * columns
+    moves = popcount(mask)
+    result = 1.0  # From the point of view of the side to move at the current node
+    while moves < cells:
+        possible = (mask + search.bottom) & search.board_mask
+        if possible & search.threats(current, mask):
+            return result
+        opponent = current ^ mask
+        forced = possible & search.threats(opponent, mask)
+        if forced:
+            move = forced & -forced  # Block one threat; a double threat is lost anyway
+        else:
+            columns_left = [column for column in search.order if possible & search.column_masks[column]]
+            move = possible & search.column_masks[rng.choice(columns_left)]
+        current, mask = opponent, mask | move
+        moves += 1
+        result = 1.0 - result
+    return 0.5
+
+
+class Node:
+    __slots__ = ('column', 'parent', 'current', 'mask', 'children', 'untried', 'visits', 'value', 'terminal', 'priors')
+
+    def __init__(self, column, parent, current, mask, untried, terminal=None):
+        self.column = column  # Column played to reach this node
+        self.parent = parent
+        self.current = current  # Pieces of the side to move here
+        self.mask = mask
+        self.children = []
+        self.untried = untried  # Legal columns without a child yet, best candidates last
+        self.visits = 0
+        self.value = 0.0  # Total result for the player who moved into this node
+        self.terminal = terminal  # Result for that player if the game ended with this move
+        self.priors = None  # Move probabilities from the evaluator, once it has seen this node
+
+
+class MCTS:
+    """Monte Carlo Tree Search (UCT) with playouts spread over a process pool.
+
+    Each round selects a batch of leaves, using virtual loss so the batch
+    explores different lines, and sends their playouts to the pool in one
+    map() call. Results come back in order and are merged into the tree on
+    this process. Strength is set by the total number of playouts, and every
+    playout is seeded from its index, so a search returns the same move for
+    any number of workers.
+
+    With an evaluator such as PolicyValueNet, leaves are scored by the
+    network instead of playouts: each batch of leaves is evaluated in one
+    call, and the policy guides selection as PUCT priors.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, playouts=20000, batch_size=64,
+                 workers=None, exploration=1.4, seed=0, evaluator=None):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.playouts = playouts
+        self.batch_size = batch_size
+        self.workers = os.cpu_count() if workers is None else workers  # 0 runs playouts in this process
+        self.exploration = exploration
+        self.seed = seed
+        self.evaluator = evaluator
+        self.search = geometry(rows, columns, connect)
+        self.pool = None  # Started on first use
+        self.should_stop = None  # Optional callable polled between batches
+        self.stats = None  # SearchStats of the last search
+        self.max_depth = 0  # Deepest leaf selected so far
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def map(self, tasks):
+        if self.workers == 0 or len(tasks) < 2:
+            return list(map(run_playout, tasks))
+        if self.pool is None:
+            self.pool = multiprocessing.get_context('spawn').Pool(self.workers)
+        return self.pool.map(run_playout, tasks, chunksize=max(1, len(tasks) // (4 * self.workers)))
+
+    def make_node(self, column, parent, moved, mask):
+        # moved holds the pieces of the player who just moved
+        search = self.search
+        terminal = None
+        if self.has_won(moved):
+            terminal = 1.0
+        elif mask == search.board_mask:
+            terminal = 0.5
+        untried = []
+        if terminal is None:
+            current = moved ^ mask
+            possible = (mask + search.bottom) & search.board_mask
+            # Same guidance as the playouts: take a win, otherwise block, otherwise anything
+            candidates = possible & search.threats(current, mask) or possible & search.threats(moved, mask) or possible
+            untried = [c for c in reversed(search.order) if candidates & search.column_masks[c]]
+        return Node(column, parent, moved ^ mask, mask, untried, terminal)
+
+    def has_won(self, pieces):
+        # Any line of connect pieces, by repeated shift-AND in each direction
+        for shift in (1,) + self.search.line_shifts:
+            line = pieces
+            for _ in range(self.connect - 1):
+                line &= line >> shift
+            if line:
+                return True
+        return False
+
+    def expand(self, node, column):
+        node.untried.remove(column)
+        move = (node.mask + self.search.bottom) & self.search.column_masks[column]
+        child = self.make_node(column, node, node.current | move, node.mask | move)
+        node.children.append(child)
+        child.visits += 1
+        return child
+
+    def select(self, root):
+        """Walk to a leaf with UCT, expanding one child; applies virtual loss on the way."""
+        node = root
+        node.visits += 1
+        depth = 0
+        while node.terminal is None:
+            depth += 1
+            self.max_depth = max(self.max_depth, depth)
+            if self.evaluator is not None:
+                if node.priors is None:
+                    return node  # Still waiting for the evaluator
+                child, column = self.puct_choice(node)
+                if child is None:
+                    return self.expand(node, column)
+                node = child
+            elif node.untried:
+                return self.expand(node, node.untried[-1])
+            else:
+                log_visits = math.log(node.visits)
+                node = max(node.children, key=lambda child: child.value / child.visits +
+                           self.exploration * math.sqrt(log_visits / child.visits))
+            node.visits += 1
+        return node
+
+    def puct_choice(self, node):
+        # (child, column) with the best PUCT score; child is None for a column not expanded yet
+        scale = self.exploration * math.sqrt(node.visits)
+        best, best_score = (None, None), -1.0
+        for child in node.children:
+            score = child.value / child.visits + scale * node.priors[child.column] / (1 + child.visits)
+            if score > best_score:
+                best, best_score = (child, child.column), score
+        for column in reversed(node.untried):
+            score = 0.5 + scale * node.priors[column]  # Unvisited moves count as even
+            if score > best_score:
+                best, best_score = (None, column), score
+        return best
+
+    def evaluate(self, leaves):
+        # Score leaves with the evaluator in one batch; returns results for the player who moved into each
+        imperial = [leaf.current if popcount(leaf.mask) % 2 == 0 else leaf.current ^ leaf.mask for leaf in leaves]
+        rebel = [leaf.mask ^ pieces for leaf, pieces in zip(leaves, imperial)]
+        boards = boards_from_masks(self.rows, self.columns, {'Imperial': imperial, 'Rebel': rebel})
+        policy, value = self.evaluator.evaluate(boards)
+        for leaf, priors in zip(leaves, policy.tolist()):
+            leaf.priors = priors
+        return ((1.0 - value) / 2).tolist()
+
+    def backpropagate(self, node, result):
+        # result is for the player who moved into node; visits were counted in select()
+        while node is not None:
+            node.value += result
+            result = 1.0 - result
+            node = node.parent
+
+    def run(self, position):
+        """Grow a tree from position with self.playouts playouts and return its root."""
+        current, mask = self.search.split(position)
+        root = self.make_node(None, None, current ^ mask, mask)
+        if root.terminal is not None:
+            raise ValueError("The game is already over")
+        self.stats = SearchStats('mcts')
+        self.stats.start()
+        self.max_depth = 0
+        if self.evaluator is not None:
+            self.evaluate([root])
+        try:
+            self.grow(root)
+        finally:
+            self.stats.depth = self.max_depth
+            self.stats.finish(root.visits)  # Nodes are the simulations run
+        return root
+
+    def grow(self, root):
+        done = 0
+        while done < self.playouts:
+            if self.should_stop is not None and self.should_stop():
+                raise SearchTimeout()
+            leaves = [self.select(root) for _ in range(min(self.batch_size, self.playouts - done))]
+            if self.evaluator is not None:
+                pending = list({id(leaf): leaf for leaf in leaves if leaf.terminal is None}.values())  # A leaf can be picked twice
+                results = dict(zip(map(id, pending), self.evaluate(pending))) if pending else {}
+                for leaf in leaves:
+                    self.backpropagate(leaf, leaf.terminal if leaf.terminal is not None else results[id(leaf)])
+            else:
+                tasks = [(self.rows, self.columns, self.connect, leaf.current, leaf.mask, self.seed * 1000003 + done + i)
+                         for i, leaf in enumerate(leaves) if leaf.terminal is None]
+                results = iter(self.map(tasks))
+                for leaf in leaves:
+                    # Playouts score the side to move at the leaf, the opponent of the player who moved into it
+                    self.backpropagate(leaf, leaf.terminal if leaf.terminal is not None else 1.0 - next(results))
+            done += len(leaves)
+
+    def best_move(self, position):
+        """Return (column, expected result) of the most visited move, from 0 (loss) to 1 (win)."""
+        root = self.run(position)
+        for child in root.children:
+            if child.terminal == 1.0:
+                return child.column, 1.0  # Immediate win
+        best = max(root.children, key=lambda child: child.visits)
+        return best.column, best.value / best.visits
+
+    def analyze(self, position):
+        """Visit count and expected result of every column the tree explored, else None.
+
+        Full columns are None, and so are all other columns when the side to
+        move can win at once or has to block.
+        """
+        root = self.run(position)
+        stats = [None] * self.columns
+        for child in root.children:
+            stats[child.column] = (child.visits, child.value / child.visits)
+        return stats
@@ -0,0 +1,47 @@
+from .BackgroundWorker import BackgroundWorker, serve
+from .ProofNumberSearch import ProofNumberSearch
+
+MATE_TIME = 5.0  # Seconds the mate finder may spend on one position
+
+
+def run_mate_finder(rows, columns, connect, requests, results, latest):
+    # Mate finder process entry point: prove or disprove a forced win for each requested position
+    search = ProofNumberSearch(rows, columns, connect)
+    for request_id, (position, time_limit), should_stop in serve(requests, latest):
+        result, column = search.winning_move(position, time_limit, should_stop=should_stop)
+        results.put((request_id, position, result, column))
+
+
+class MateWorker(BackgroundWorker):
+    """Looks for a forced win in a background process, so the frame loop never waits for it.
+
+    start() hands over a position and returns immediately; poll(), called
+    once per frame, returns (position, result, column) when the search is
+    done. result is True with a winning column, False if there is no forced
+    win, or None if the time limit ran out first.
+    """
+
+    name = 'mate finder'
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        super().__init__(run_mate_finder, rows, columns, connect)
+        self.position = None  # Position being searched
+
+    def start(self, position, time_limit=MATE_TIME):
+        self.position = position
+        self.send(position, time_limit)  # Also stops the search of the previous position
+
+    def cancel(self):
+        super().cancel()
+        self.position = None
+
+    def poll(self):
+        """Drain results without blocking; return (position, result, column) once the search is done.
+
+        Raises WorkerDied if the mate finder process is gone.
+        """
+        for request_id, position, result, column in self.drain():
+            if request_id == self.request_id:
+                self.position = None
+                return position, result, column
+        return None
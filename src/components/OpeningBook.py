@@ -0,0 +1,85 @@
+import mmap
+import os
+import struct
+
+MAGIC = b'C4BK'
+HEADER = struct.Struct('<4sBBBBI4x')  # Magic, rows, columns, connect, depth, record count
+RECORD = struct.Struct('<QbB')  # Canonical position key, exact score, best column
+KEY = struct.Struct('<Q')
+
+
+class OpeningBook:
+    """Read-only opening book, memory-mapped from a file of sorted records.
+
+    Each record holds the canonical Position key of a position, its exact
+    score for the side to move and the best column in the canonical frame.
+    Lookups binary-search the mapped file directly, so opening a book is
+    instant and only the pages actually touched are read from disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError(f"Not an opening book: {path}")
+        magic, self.rows, self.columns, self.connect, self.depth, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or len(self.data) != HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError(f"Not an opening book: {path}")
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.data.close()
+
+    def find(self, key):
+        """Return (score, column) stored for a canonical key, or None."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self.data, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        record_key, score, column = RECORD.unpack_from(self.data, HEADER.size + low * RECORD.size)
+        return (score, column) if record_key == key else None
+
+    def get(self, key, default=None):
+        # Score only, so the book can stand in for the Solver's dictionary book
+        entry = self.find(key)
+        return default if entry is None else entry[0]
+
+    def matches(self, rows, columns, connect):
+        return (self.rows, self.columns, self.connect) == (rows, columns, connect)
+
+    def lookup(self, position):
+        """Return (score, column) for position, or None if it is not in the book."""
+        if position.moves > self.depth or not self.matches(position.rows, position.columns, position.connect):
+            return None
+        canonical = position.canonical()
+        entry = self.find(canonical.key)
+        if entry is None:
+            return None
+        score, column = entry
+        if canonical is not position:
+            column = self.columns - 1 - column  # Stored for the mirror image
+        return score, column
+
+
+def write_book(path, rows, columns, connect, depth, entries):
+    """Write (canonical key, score, column) entries as a book file, replacing it atomically."""
+    entries = sorted(entries)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, rows, columns, connect, depth, len(entries)))
+        for key, score, column in entries:
+            book_file.write(RECORD.pack(key, score, column))
+    os.replace(temporary, path)
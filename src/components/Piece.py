@@ -2,6 +2,8 @@ import pygame
 import random  # Import the random module
 
 class Piece:
+    images = {}  # Loaded ship images by path, shared so new games don't reload them
+
     def __init__(self, player):
         self.player = player
         self.image = self.load_image()
@@ -15,8 +17,7 @@ class Piece:
                 "assets/images/imperial_tie_defender.png"
             ]
             selected_ship = random.choice(imperial_ships)  # Randomly select a ship
-            print(f"Loading image for Imperial: {selected_ship}")  # Debug print
-            return pygame.image.load(selected_ship)  # Load the selected image
+            return self.get_cached_image(selected_ship)
         else:
             rebel_ships = [
                 "assets/images/rebel_x_wing.png",
@@ -25,8 +26,13 @@ class Piece:
                 "assets/images/rebel_b_wing.png"
             ]
             selected_ship = random.choice(rebel_ships)  # Randomly select a ship
-            print(f"Loading image for Rebel: {selected_ship}")  # Debug print
-            return pygame.image.load(selected_ship)  # Load the selected image
+            return self.get_cached_image(selected_ship)
+
+    def get_cached_image(self, path):
+        if path not in Piece.images:
+            print(f"Loading image for {self.player}: {path}")  # Debug print
+            Piece.images[path] = pygame.image.load(path)  # Load the selected image
+        return Piece.images[path]
 
     def get_image(self):
         return self.image
@@ -0,0 +1,90 @@
+import numpy as np
+from .BatchRules import EMPTY, PLAYER_CODES
+
+
+class PolicyValueNet:
+    """Small policy/value network (an MLP) with NumPy-only inference.
+
+    Boards use the BatchRules encoding: an (N, rows, cols) int8 array of
+    PLAYER_CODES, row 0 at the top. Each board is seen from the side to
+    move, as one plane of its own pieces and one of the opponent's, so a
+    whole batch goes through the network as a few matrix products.
+    Weights live in a .npz file: hidden layers w0/b0, w1/b1, ..., then
+    policy_w/policy_b (one logit per column) and value_w/value_b.
+    """
+
+    def __init__(self, weights):
+        self.rows = int(weights['rows'])
+        self.columns = int(weights['columns'])
+        self.hidden = []
+        while f'w{len(self.hidden)}' in weights:
+            layer = len(self.hidden)
+            self.hidden.append((np.asarray(weights[f'w{layer}'], dtype=np.float32),
+                                np.asarray(weights[f'b{layer}'], dtype=np.float32)))
+        self.policy = (np.asarray(weights['policy_w'], dtype=np.float32), np.asarray(weights['policy_b'], dtype=np.float32))
+        self.value = (np.asarray(weights['value_w'], dtype=np.float32), np.asarray(weights['value_b'], dtype=np.float32))
+        inputs = 2 * self.rows * self.columns
+        for weight, bias in self.hidden:
+            if weight.shape != (inputs, len(bias)):
+                raise ValueError("Hidden layer shapes do not chain")
+            inputs = len(bias)
+        for (weight, bias), outputs in ((self.policy, self.columns), (self.value, 1)):
+            if weight.shape != (inputs, outputs) or bias.shape != (outputs,):
+                raise ValueError("Output heads do not match the last hidden layer and the board")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as weights:
+            return cls(dict(weights))
+
+    @classmethod
+    def random(cls, rows=6, columns=7, hidden=(128, 128), seed=0):
+        """Untrained network with He-initialized weights, e.g. as a starting point for training."""
+        rng = np.random.default_rng(seed)
+        weights = {'rows': rows, 'columns': columns}
+        inputs = 2 * rows * columns
+        for layer, width in enumerate(hidden):
+            weights[f'w{layer}'] = rng.normal(0, np.sqrt(2 / inputs), (inputs, width))
+            weights[f'b{layer}'] = np.zeros(width)
+            inputs = width
+        weights['policy_w'] = rng.normal(0, np.sqrt(1 / inputs), (inputs, columns))
+        weights['policy_b'] = np.zeros(columns)
+        weights['value_w'] = rng.normal(0, np.sqrt(1 / inputs), (inputs, 1))
+        weights['value_b'] = np.zeros(1)
+        return cls(weights)
+
+    def save(self, path):
+        weights = {'rows': self.rows, 'columns': self.columns,
+                   'policy_w': self.policy[0], 'policy_b': self.policy[1],
+                   'value_w': self.value[0], 'value_b': self.value[1]}
+        for layer, (weight, bias) in enumerate(self.hidden):
+            weights[f'w{layer}'] = weight
+            weights[f'b{layer}'] = bias
+        np.savez(path, **weights)
+
+    def encode(self, boards):
+        # (N, 2 * rows * cols) float32 planes from the side to move's point of view
+        imperial = boards == PLAYER_CODES['Imperial']
+        rebel = boards == PLAYER_CODES['Rebel']
+        imperial_to_move = (imperial.sum(axis=(1, 2)) == rebel.sum(axis=(1, 2)))[:, None, None]  # Imperial moves first
+        own = np.where(imperial_to_move, imperial, rebel)
+        opponent = np.where(imperial_to_move, rebel, imperial)
+        return np.concatenate([own.reshape(len(boards), -1), opponent.reshape(len(boards), -1)], axis=1).astype(np.float32)
+
+    def evaluate(self, boards):
+        """Return (policy, value) for a batch of boards.
+
+        policy is (N, cols): move probabilities over the columns that are not
+        full. value is (N,): the expected result for the side to move, from
+        -1 (loss) to 1 (win).
+        """
+        x = self.encode(boards)
+        for weight, bias in self.hidden:
+            x = np.maximum(x @ weight + bias, 0)
+        logits = x @ self.policy[0] + self.policy[1]
+        logits = np.where(boards[:, 0, :] == EMPTY, logits, -np.inf)  # Full columns get no probability
+        logits -= logits.max(axis=1, keepdims=True)
+        policy = np.exp(logits)
+        policy /= policy.sum(axis=1, keepdims=True)
+        value = np.tanh(x @ self.value[0] + self.value[1])[:, 0]
+        return policy, value
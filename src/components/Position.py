@@ -0,0 +1,98 @@
+# Number of set bits in an int; int.bit_count() only exists from Python 3.10 on
+popcount = getattr(int, 'bit_count', None) or (lambda value: bin(value).count('1'))
+
+
+class Position:
+    """Immutable, hashable snapshot of a board, cheap to pickle and use as a key.
+
+    Only the geometry and two integers are stored: the Imperial pieces and
+    the height mask of all pieces, both in the BitBoard layout. Imperial
+    always moves first, as in CustomBoard, so the side to move follows from
+    the piece count.
+    """
+
+    __slots__ = ('rows', 'columns', 'connect', 'imperial', 'occupied')
+
+    def __init__(self, rows, columns, connect, imperial, occupied):
+        object.__setattr__(self, 'rows', rows)
+        object.__setattr__(self, 'columns', columns)
+        object.__setattr__(self, 'connect', connect)
+        object.__setattr__(self, 'imperial', imperial)
+        object.__setattr__(self, 'occupied', occupied)
+
+    @classmethod
+    def from_state(cls, state):
+        bitboard = state.bitboard
+        return cls(state.rows, state.columns, state.connect, bitboard.masks['Imperial'], bitboard.occupied)
+
+    @classmethod
+    def from_board(cls, board):
+        """Snapshot a CustomBoard (or Board) without touching its Piece sprites."""
+        return cls.from_state(board.state)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        # Pickle as five ints instead of the slot state dictionary
+        return (Position, (self.rows, self.columns, self.connect, self.imperial, self.occupied))
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.imperial == other.imperial and self.occupied == other.occupied and
+                self.rows == other.rows and self.columns == other.columns and self.connect == other.connect)
+
+    def __hash__(self):
+        return hash((self.rows, self.columns, self.connect, self.imperial, self.occupied))
+
+    def __repr__(self):
+        return f"Position({self.rows}, {self.columns}, {self.connect}, {self.imperial:#x}, {self.occupied:#x})"
+
+    @property
+    def stride(self):
+        return self.rows + 1  # Bits per column, including the spare top bit
+
+    @property
+    def bottom(self):
+        return sum(1 << (c * self.stride) for c in range(self.columns))
+
+    @property
+    def moves(self):
+        return popcount(self.occupied)
+
+    @property
+    def current_player(self):
+        return 'Imperial' if self.moves % 2 == 0 else 'Rebel'
+
+    @property
+    def rebel(self):
+        return self.occupied ^ self.imperial
+
+    @property
+    def key(self):
+        """Unique integer for the position within its geometry.
+
+        Adding the bottom row to the height mask leaves one marker bit above
+        each column's pieces; the Imperial bits below it spell out the column.
+        For 7x6 the key fits in 49 bits.
+        """
+        return self.imperial + self.occupied + self.bottom
+
+    def mirror(self):
+        """The left-right mirror image of this position."""
+        column_mask = (1 << self.stride) - 1
+        imperial = occupied = 0
+        for c in range(self.columns):
+            shift = (self.columns - 1 - c) * self.stride
+            imperial |= ((self.imperial >> (c * self.stride)) & column_mask) << shift
+            occupied |= ((self.occupied >> (c * self.stride)) & column_mask) << shift
+        return Position(self.rows, self.columns, self.connect, imperial, occupied)
+
+    def canonical(self):
+        """Representative shared by a position and its mirror image (smaller key wins)."""
+        mirrored = self.mirror()
+        return mirrored if mirrored.key < self.key else self
@@ -0,0 +1,222 @@
+import time
+from .Position import popcount
+from .Search import Search, SearchTimeout
+from .TranspositionTable import TranspositionTable
+
+INFINITY = 1 << 30  # Proof or disproof number of a settled node
+
+ENTRY_BYTES = 200  # Rough size of one dict entry: the key, a list of three ints and the dict slot
+
+
+class ProofTable:
+    """Proof and disproof numbers by position key, capped at a memory budget.
+
+    When the table is full, the entries whose subtrees took the least work
+    to search are dropped (small-tree garbage collection): they are the
+    cheapest to find again, while big proofs survive.
+    """
+
+    def __init__(self, megabytes=16, keep=0.5):
+        self.capacity = max(64, int(megabytes * 1024 * 1024) // ENTRY_BYTES)
+        self.keep = keep  # Share of the entries left after a collection
+        self.entries = {}  # key -> [phi, delta, work]
+        self.probes = 0
+        self.hits = 0
+        self.collections = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    def probe(self, key):
+        """Return [phi, delta, work] stored for key, or None."""
+        self.probes += 1
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def store(self, key, phi, delta, work):
+        if len(self.entries) >= self.capacity and key not in self.entries:
+            self.collect()
+        self.entries[key] = [phi, delta, work]
+
+    def collect(self):
+        works = sorted(entry[2] for entry in self.entries.values())
+        threshold = works[int(len(works) * (1 - self.keep))]
+        self.entries = {key: entry for key, entry in self.entries.items() if entry[2] >= threshold}
+        if len(self.entries) >= self.capacity * self.keep * 1.5:
+            # Too many ties at the threshold: fall back to keeping an arbitrary share of them
+            self.entries = dict(list(self.entries.items())[-int(self.capacity * self.keep):])
+        self.collections += 1
+
+
+class ProofNumberSearch(Search):
+    """Depth-first proof-number search (df-pn): does the side to move have a forced win?
+
+    Every node keeps two numbers from the point of view of its side to move:
+    phi, how many leaves still have to be proven to show a win, and delta,
+    how many to show the opposite. The search always follows the most
+    proving line and only backs up when a threshold is exceeded, so it
+    reaches deep narrow wins that full-width alpha-beta cannot afford.
+    Draws count as failure for the attacker, so a disproof means the side
+    to move cannot force a win. Numbers live in a bounded ProofTable.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, megabytes=16):
+        super().__init__(rows, columns, connect, TranspositionTable(1))  # The alpha-beta table goes unused
+        self.proofs = ProofTable(megabytes)
+        self.cells = rows * columns
+        self.attacker_parity = 0  # Move-count parity of the positions where the attacker moves
+        self.max_nodes = None
+
+    def prove(self, position, time_limit=None, max_nodes=None, should_stop=None):
+        """True if the side to move can force a win, False if it cannot, None if the budget ran out."""
+        self.begin(position, time_limit, max_nodes, should_stop)
+        try:
+            phi, delta = self.search_node(*self.split(position), INFINITY, INFINITY)
+        except SearchTimeout:
+            return None
+        finally:
+            self.end()
+        return True if phi == 0 else False if delta == 0 else None
+
+    def winning_move(self, position, time_limit=None, max_nodes=None, should_stop=None):
+        """(result, column): result as from prove(), column a winning move when result is True, else None.
+
+        The move is read off the proven root: a child whose numbers say the
+        defender is lost. Unlike winning_moves(), no other column is searched.
+        """
+        self.begin(position, time_limit, max_nodes, should_stop)
+        current, mask = self.split(position)
+        try:
+            phi, delta = self.search_node(current, mask, INFINITY, INFINITY)
+            if phi != 0:
+                return (False if delta == 0 else None), None
+            possible = (mask + self.bottom) & self.board_mask
+            wins = possible & self.threats(current, mask)
+            if wins:
+                return True, self.move_column(wins & -wins)
+            children = self.expand(current, mask)
+            for child in children:
+                entry = self.proofs.probe((current ^ mask) + child + self.bottom)
+                if entry is not None and entry[1] == 0:
+                    return True, self.move_column(child ^ mask)
+            # The proving child was dropped from the full table: find it again
+            for child in children:
+                if self.search_node(current ^ mask, child, INFINITY, INFINITY)[1] == 0:
+                    return True, self.move_column(child ^ mask)
+            return None, None
+        except SearchTimeout:
+            return None, None
+        finally:
+            self.end()
+
+    def move_column(self, move):
+        return (move.bit_length() - 1) // self.stride
+
+    def winning_moves(self, position, time_limit=None, max_nodes=None, should_stop=None):
+        """Columns that keep a forced win for the side to move; [] if there is none, None if out of budget."""
+        self.begin(position, time_limit, max_nodes, should_stop)
+        current, mask = self.split(position)
+        try:
+            if self.search_node(current, mask, INFINITY, INFINITY)[0] != 0:
+                return []
+            possible = (mask + self.bottom) & self.board_mask
+            wins = possible & self.threats(current, mask)
+            columns = []
+            for column in range(self.columns):
+                move = possible & self.column_masks[column]
+                if not move:
+                    continue
+                # After the move the defender is to move: a win means the defender's numbers read (inf, 0)
+                if move & wins or self.search_node(current ^ mask, mask | move, INFINITY, INFINITY)[0] == INFINITY:
+                    columns.append(column)
+            return columns
+        except SearchTimeout:
+            return None
+        finally:
+            self.end()
+
+    def begin(self, position, time_limit, max_nodes, should_stop):
+        self.begin_stats('proof-number')
+        self.stats.start(self.proofs)  # Report hits in the proof table
+        self.proofs.clear()  # Entries depend on who the attacker is
+        self.attacker_parity = position.moves % 2
+        self.deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self.max_nodes = max_nodes
+        self.should_stop = should_stop
+
+    def end(self):
+        self.deadline = None
+        self.max_nodes = None
+        self.should_stop = None
+        self.end_stats()
+
+    def over_budget(self):
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            return True
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return True
+        return self.should_stop is not None and self.should_stop()
+
+    def expand(self, current, mask):
+        """(phi, delta) of a node settled by simple rules, or the moves worth searching."""
+        possible = (mask + self.bottom) & self.board_mask
+        if possible & self.threats(current, mask):
+            return 0, INFINITY  # The side to move wins at once
+        opponent_threats = self.threats(current ^ mask, mask)
+        forced = possible & opponent_threats
+        if forced & (forced - 1):
+            return INFINITY, 0  # Two threats to block
+        if forced:
+            possible = forced
+        possible &= ~(opponent_threats >> 1)  # Never play right below an opponent threat
+        if not possible:
+            return INFINITY, 0  # Every move hands the opponent a win
+        if popcount(mask) >= self.cells - 1:
+            # Only a draw is left: a failure for the attacker, a success for the defender
+            return (INFINITY, 0) if popcount(mask) % 2 == self.attacker_parity else (0, INFINITY)
+        return [mask | possible & self.column_masks[column]
+                for column in self.order if possible & self.column_masks[column]]
+
+    def search_node(self, current, mask, phi_threshold, delta_threshold):
+        """Expand the node until its phi or delta reaches its threshold; return (phi, delta)."""
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and self.over_budget():
+            raise SearchTimeout()
+        key = current + mask + self.bottom
+        children = self.expand(current, mask)
+        if isinstance(children, tuple):
+            self.proofs.store(key, *children, 1)
+            return children
+        opponent = current ^ mask
+        child_keys = [opponent + child + self.bottom for child in children]
+        entry = self.proofs.probe(key)
+        started = self.nodes - (entry[2] if entry is not None else 0)  # Work counts every visit
+        while True:
+            # A node's phi is its children's smallest delta, its delta the sum of their phis
+            delta = 0
+            best = None
+            best_delta = second_delta = INFINITY
+            best_phi = 0
+            for i, child_key in enumerate(child_keys):
+                entry = self.proofs.probe(child_key)
+                child_phi, child_delta = (entry[0], entry[1]) if entry is not None else (1, 1)
+                delta = min(delta + child_phi, INFINITY)
+                if child_delta < best_delta:
+                    second_delta = best_delta
+                    best, best_delta, best_phi = i, child_delta, child_phi
+                elif child_delta < second_delta:
+                    second_delta = child_delta
+            phi = best_delta
+            if phi >= phi_threshold or delta >= delta_threshold:
+                self.proofs.store(key, phi, delta, self.nodes - started)
+                return phi, delta
+            # Thresholds for the most proving child: stay with it until it falls clearly behind the
+            # second best (the 1 + epsilon trick), so the search does not thrash between two children
+            child_phi_threshold = min(delta_threshold - delta + best_phi, INFINITY)
+            child_delta_threshold = min(phi_threshold, second_delta + (second_delta >> 2) + 1)
+            self.search_node(opponent, children[best], child_phi_threshold, child_delta_threshold)
@@ -0,0 +1,58 @@
+import random
+from functools import lru_cache
+
+# Horizontal, vertical, and the two diagonals as (row step, column step)
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Rules:
+    """Connect-N geometry with precomputed winning-line tables.
+
+    Uses the BitBoard layout: bit column * (rows + 1) + height holds the cell
+    `height` places above the bottom of `column`. Every winning line is stored
+    once as a bitmask, and lines_through[bit] lists the indices of the lines
+    that contain that cell, so a win check after a move only looks at a
+    handful of lines no matter how large the board is.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.stride = rows + 1  # Bits per column, including the spare top bit
+        self.lines = []  # Bitmask of each winning line
+        self.line_cells = []  # Grid cells (row, column) of each winning line
+
+        through = [[] for _ in range(columns * self.stride)]
+        for row in range(rows):
+            for column in range(columns):
+                for d_row, d_col in DIRECTIONS:
+                    end_row = row + (connect - 1) * d_row
+                    end_col = column + (connect - 1) * d_col
+                    if not (0 <= end_row < rows and 0 <= end_col < columns):
+                        continue
+                    cells = tuple((row + k * d_row, column + k * d_col) for k in range(connect))
+                    index = len(self.lines)
+                    mask = 0
+                    for r, c in cells:
+                        mask |= 1 << self.bit_index(r, c)
+                        through[self.bit_index(r, c)].append(index)
+                    self.lines.append(mask)
+                    self.line_cells.append(cells)
+        self.lines_through = [tuple(indices) for indices in through]
+
+        # 64-bit Zobrist keys per cell for each of the two players, plus side to move.
+        # Seeded by geometry so every process derives the same keys.
+        rng = random.Random(f"zobrist-{rows}x{columns}x{connect}")
+        self.zobrist = [[rng.getrandbits(64) for _ in range(columns * self.stride)] for _ in range(2)]
+        self.zobrist_side = rng.getrandbits(64)
+
+    def bit_index(self, row, column):
+        # Grid row 0 is the top of the board
+        return column * self.stride + self.rows - 1 - row
+
+
+@lru_cache(maxsize=None)
+def get_rules(rows=6, columns=7, connect=4):
+    """Shared Rules instance per geometry, so tables are only built once."""
+    return Rules(rows, columns, connect)
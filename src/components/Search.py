@@ -0,0 +1,282 @@
+import time
+from .Position import popcount
+from .SearchStats import SearchStats
+from .Tablebase import WIN, DRAW, LOSS
+from .TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+
+WIN_SCORE = 1000000  # Minus the ply count, so faster wins score higher
+TABLEBASE_WIN = WIN_SCORE // 2  # Proven win of unknown length, below the range of counted wins
+TABLEBASE_SCORES = {WIN: TABLEBASE_WIN, DRAW: 0, LOSS: -TABLEBASE_WIN}
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out or it is cancelled."""
+
+
+class Search:
+    """Negamax with alpha-beta pruning over raw integer bitboards.
+
+    A node is just two ints in the BitBoard layout: the pieces of the side to
+    move and the height mask. Playing a move is an OR and switching sides is
+    an XOR, so the search never copies a grid or creates Piece objects.
+    Results are cached in a fixed-size TranspositionTable keyed by
+    current + mask + bottom, which is unique for every position.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, table=None):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.stride = rows + 1
+        self.bottom = sum(1 << (c * self.stride) for c in range(columns))
+        self.board_mask = self.bottom * ((1 << rows) - 1)
+        self.column_masks = [((1 << rows) - 1) << (c * self.stride) for c in range(columns)]
+        # Center-first move ordering
+        self.order = sorted(range(columns), key=lambda c: abs(2 * c - (columns - 1)))
+        # Bit distance between neighbours along a row and along both diagonals
+        self.line_shifts = (self.stride, self.stride + 1, self.stride - 1)
+        self.table = table if table is not None else TranspositionTable()
+        self.nodes = 0
+        self.deadline = None  # time.monotonic() value at which to abort, if any
+        self.should_stop = None  # Optional callable polled together with the deadline
+        self.tablebase = None  # Optional Tablebase, probed at the leaves for exact results
+        self.stats = None  # SearchStats of the last search
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def threats(self, pieces, mask):
+        """Empty cells that would complete a line for pieces."""
+        if self.connect != 4:
+            return self.threats_connect_n(pieces, mask)
+        # Vertical: only the cell on top of three can be empty
+        result = (pieces << 1) & (pieces << 2) & (pieces << 3)
+        for shift in self.line_shifts:
+            # Gap at either end or at either inner position of the four cells
+            pair = (pieces << shift) & (pieces << 2 * shift)
+            result |= pair & (pieces << 3 * shift)
+            result |= pair & (pieces >> shift)
+            pair = (pieces >> shift) & (pieces >> 2 * shift)
+            result |= pair & (pieces << shift)
+            result |= pair & (pieces >> 3 * shift)
+        return result & (self.board_mask ^ mask)
+
+    def threats_connect_n(self, pieces, mask):
+        # Same as threats() for any line length, built from running ANDs on each side of the gap
+        n = self.connect - 1
+        result = -1
+        for k in range(1, n + 1):
+            result &= pieces << k
+        for shift in self.line_shifts:
+            before, after = [-1], [-1]
+            for k in range(1, n + 1):
+                before.append(before[-1] & (pieces << k * shift))
+                after.append(after[-1] & (pieces >> k * shift))
+            for k in range(n + 1):
+                result |= before[k] & after[n - k]
+        return result & (self.board_mask ^ mask)
+
+    def split(self, position):
+        # (pieces of the side to move, height mask) for a Position
+        current = position.imperial if position.current_player == 'Imperial' else position.rebel
+        return current, position.occupied
+
+    def best_move(self, position, depth):
+        """Return (column, score) for the side to move in position."""
+        self.begin_stats('alpha-beta')
+        self.deadline = None
+        current, mask = self.split(position)
+        result = self.root(current, mask, depth, -WIN_SCORE - 1, WIN_SCORE + 1)
+        self.stats.iteration(depth, self.nodes)
+        self.end_stats()
+        return result
+
+    def iterative_deepening(self, position, time_limit, max_depth=None, report=None, should_stop=None):
+        """Search one ply deeper at a time until time_limit seconds have passed.
+
+        report(depth, column, score) is called after every completed depth.
+        Returns (column, score, depth) from the deepest completed iteration.
+        """
+        self.begin_stats('alpha-beta')
+        self.deadline = time.monotonic() + time_limit
+        self.should_stop = should_stop
+        current, mask = self.split(position)
+        max_depth = max_depth or self.rows * self.columns - position.moves
+        possible = (mask + self.bottom) & self.board_mask
+        # Fallback if not even depth 1 completes: first legal column, center first
+        best = (next(c for c in self.order if possible & self.column_masks[c]), 0, 0)
+        order = self.order
+        try:
+            for depth in range(1, max_depth + 1):
+                column, score = self.root(current, mask, depth, -WIN_SCORE - 1, WIN_SCORE + 1, order)
+                best = (column, score, depth)
+                self.stats.iteration(depth, self.nodes)
+                if report is not None:
+                    report(depth, column, score)
+                if abs(score) > WIN_SCORE - 1000:
+                    break  # Forced result found; deeper search cannot change it
+                order = [column] + [c for c in self.order if c != column]  # Previous best first
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+            self.should_stop = None
+            self.end_stats()
+        return best
+
+    def column_scores(self, position, report, max_depth=None, should_stop=None):
+        """Score every column one ply deeper at a time, for analysis rather than play.
+
+        Each column gets its own full-window search, so every score is exact
+        at its depth, not just the best one. report(depth, scores) is called
+        after every completed depth; scores holds None for full columns.
+        Runs until max_depth, until every column is a forced result, or until
+        should_stop() is true. Returns the scores of the deepest completed depth.
+        """
+        self.begin_stats('alpha-beta')
+        self.deadline = float('inf')  # No time limit, but keep polling should_stop
+        self.should_stop = should_stop
+        current, mask = self.split(position)
+        max_depth = max_depth or self.rows * self.columns - position.moves
+        possible = (mask + self.bottom) & self.board_mask
+        wins = possible & self.threats(current, mask)
+        scores = [None] * self.columns
+        try:
+            for depth in range(1, max_depth + 1):
+                depth_scores = [None] * self.columns
+                for column in self.order:
+                    move = possible & self.column_masks[column]
+                    if move & wins:
+                        depth_scores[column] = WIN_SCORE  # Win on this move
+                    elif move:
+                        depth_scores[column] = -self.negamax(current ^ mask, mask | move, depth - 1,
+                                                             -WIN_SCORE - 1, WIN_SCORE + 1, 1)
+                scores = depth_scores
+                self.stats.iteration(depth, self.nodes)
+                report(depth, scores)
+                if all(score is None or abs(score) > WIN_SCORE - 1000 for score in scores):
+                    break  # Every column is a forced result; deeper search cannot change them
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+            self.should_stop = None
+            self.end_stats()
+        return scores
+
+    def begin_stats(self, engine):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.stats = SearchStats(engine)
+        self.stats.start(self.table)
+
+    def end_stats(self):
+        self.stats.finish(self.nodes, self.cutoffs, self.first_move_cutoffs)
+
+    def out_of_time(self):
+        return time.monotonic() > self.deadline or (self.should_stop is not None and self.should_stop())
+
+    def root(self, current, mask, depth, alpha, beta, order=None):
+        possible = (mask + self.bottom) & self.board_mask
+        wins = possible & self.threats(current, mask)
+        if wins:
+            for column in self.order:
+                if wins & self.column_masks[column]:
+                    return column, WIN_SCORE  # Win on this move
+        best_column, best_score = None, -WIN_SCORE - 1
+        for column in order or self.order:
+            move = possible & self.column_masks[column]
+            if not move:
+                continue
+            score = -self.negamax(current ^ mask, mask | move, depth - 1, -beta, -alpha, 1)
+            if score > best_score:
+                best_column, best_score = column, score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_column, best_score
+
+    def negamax(self, current, mask, depth, alpha, beta, ply):
+        """Score of the node for the side to move; current holds the side to move's pieces."""
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 1023 == 0 and self.out_of_time():
+            raise SearchTimeout()
+        opponent = current ^ mask
+        possible = (mask + self.bottom) & self.board_mask
+        if not possible:
+            return 0  # Board full: draw
+        own_threats = self.threats(current, mask)
+        if possible & own_threats:
+            return WIN_SCORE - ply  # Win on this move
+        opponent_threats = self.threats(opponent, mask)
+        if depth <= 0:
+            if self.tablebase is not None:
+                result = self.tablebase.probe(current, mask)
+                if result is not None:
+                    return TABLEBASE_SCORES[result]
+            # Leaf: open cells that would complete a line, for either side
+            return popcount(own_threats) - popcount(opponent_threats)
+        forced = possible & opponent_threats
+        if forced:
+            if forced & (forced - 1):
+                return -(WIN_SCORE - ply - 1)  # Two threats at once cannot both be blocked
+            possible = forced
+        possible &= ~(opponent_threats >> 1)  # Never play right below an opponent threat
+        if not possible:
+            return -(WIN_SCORE - ply - 1)
+
+        key = current + mask + self.bottom
+        entry = self.table.probe(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, flag, score, table_move = entry
+            if entry_depth >= depth:
+                score = self.from_table(score, ply)
+                if flag == EXACT or (flag == LOWER and score >= beta) or (flag == UPPER and score <= alpha):
+                    return score
+        original_alpha = alpha
+        best_score, best_column = -WIN_SCORE - 1, None
+        first = True
+        for column in self.move_order(table_move):
+            move = possible & self.column_masks[column]
+            if not move:
+                continue
+            score = -self.negamax(opponent, mask | move, depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_column = score, column
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        self.first_move_cutoffs += first
+                        break
+            first = False
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, self.to_table(best_score, ply), best_column)
+        return best_score
+
+    def move_order(self, first):
+        # Best move from the table first, then center first
+        if first is None or first < 0:
+            return self.order
+        return [first] + [column for column in self.order if column != first]
+
+    def to_table(self, score, ply):
+        # Store win/loss scores relative to this node so they stay valid at any ply
+        if score > WIN_SCORE - 1000:
+            return score + ply
+        if score < -WIN_SCORE + 1000:
+            return score - ply
+        return score
+
+    def from_table(self, score, ply):
+        if score > WIN_SCORE - 1000:
+            return score - ply
+        if score < -WIN_SCORE + 1000:
+            return score + ply
+        return score
@@ -0,0 +1,95 @@
+import json
+import time
+
+
+class SearchStats:
+    """What one AI search did: work done, speed, table use and pruning quality.
+
+    Engines create one per search, call start() before it, iteration() after
+    every completed depth and finish() at the end, then hand it back with
+    the move. It pickles, so it can travel back from a worker process.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine  # 'alpha-beta', 'solver' or 'mcts'
+        self.nodes = 0
+        self.seconds = 0.0
+        self.depth = 0  # Deepest completed iteration, plies to the end for the solver, tree depth for MCTS
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0  # Beta cutoffs
+        self.first_move_cutoffs = 0  # Beta cutoffs caused by the first move searched
+        self.iteration_nodes = []  # Cumulative nodes after each completed depth
+        self.started = None
+        self.table = None  # Transposition table being watched, until finish()
+        self.probes_before = self.hits_before = 0
+
+    def start(self, table=None):
+        self.started = time.monotonic()
+        # Tables live across searches, so only count what this search adds
+        self.table = table
+        if table is not None:
+            self.probes_before, self.hits_before = table.probes, table.hits
+
+    def iteration(self, depth, nodes):
+        self.depth = depth
+        self.iteration_nodes.append(nodes)
+
+    def finish(self, nodes, cutoffs=0, first_move_cutoffs=0):
+        self.seconds = time.monotonic() - self.started
+        self.nodes = nodes
+        self.cutoffs = cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        if self.table is not None:
+            self.tt_probes = self.table.probes - self.probes_before
+            self.tt_hits = self.table.hits - self.hits_before
+            self.table = None  # Keep the stats small and picklable
+
+    @property
+    def nps(self):
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        # Share of cutoffs found on the first move: how good the move ordering is
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """Growth in nodes from the second-to-last to the last completed depth, or None."""
+        if len(self.iteration_nodes) < 2:
+            return None
+        previous = self.iteration_nodes[-2]
+        last = self.iteration_nodes[-1] - previous
+        earlier = previous - (self.iteration_nodes[-3] if len(self.iteration_nodes) > 2 else 0)
+        return last / earlier if earlier else None
+
+    def as_dict(self):
+        ebf = self.effective_branching_factor
+        return {'engine': self.engine, 'nodes': self.nodes, 'seconds': round(self.seconds, 4),
+                'nps': round(self.nps), 'depth': self.depth,
+                'tt_probes': self.tt_probes, 'tt_hits': self.tt_hits, 'tt_hit_rate': round(self.tt_hit_rate, 4),
+                'cutoffs': self.cutoffs, 'first_move_cutoff_rate': round(self.first_move_cutoff_rate, 4),
+                'ebf': None if ebf is None else round(ebf, 3)}
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def log(self, path, **extra):
+        """Append the stats as one JSON line, with any extra fields such as the move played."""
+        with open(path, 'a') as log_file:
+            log_file.write(json.dumps({**self.as_dict(), **extra}) + '\n')
+
+    def lines(self):
+        # Short text lines for the on-screen overlay
+        ebf = self.effective_branching_factor
+        return [f"{self.engine}  depth {self.depth}",
+                f"nodes {self.nodes}  {self.nps / 1000:.1f}k/s",
+                f"time {self.seconds:.2f}s",
+                f"TT {self.tt_hits}/{self.tt_probes} ({self.tt_hit_rate:.0%})",
+                f"first-move cutoffs {self.first_move_cutoff_rate:.0%}",
+                f"EBF {'-' if ebf is None else f'{ebf:.2f}'}"]
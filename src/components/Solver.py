@@ -0,0 +1,239 @@
+import time
+from .Position import Position, popcount
+from .Search import Search, SearchTimeout
+from .Tablebase import WIN, DRAW, LOSS
+from .TranspositionTable import LOWER, UPPER
+
+# Opening moves of standard 7x6 Connect Four, as played columns, with the exact
+# score for the side to move; seeds the opening book when no book file is given
+STANDARD_OPENINGS = {
+    (): 1,
+    (0,): 2, (1,): 1, (2,): 0, (3,): -1, (4,): 0, (5,): 1, (6,): 2,
+}
+
+
+class Solver(Search):
+    """Exact game-theoretic solver for Connect Four positions.
+
+    Scores follow the usual convention: positive if the side to move wins,
+    negative if it loses, zero for a draw, and larger in absolute value the
+    sooner the game ends (cells // 2 + 1 minus the winner's piece count once
+    they win). solve() narrows the score with null-window negamax calls,
+    using only non-losing moves, threat-based move ordering, the inherited
+    transposition table for bounds, an opening book for shallow positions and,
+    if one is set, a tablebase for win/draw/loss bounds.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4, table=None, book=None):
+        super().__init__(rows, columns, connect, table)
+        self.cells = rows * columns
+        if book is None and (rows, columns, connect) == (6, 7, 4):
+            book = self.seed_book()
+        self.book = book  # Anything with get(canonical Position key) -> score or None, such as an OpeningBook
+        if book is None:
+            self.book_depth = -1
+        else:
+            self.book_depth = getattr(book, 'depth', max(len(moves) for moves in STANDARD_OPENINGS))
+
+    def seed_book(self):
+        book = {}
+        for moves, score in STANDARD_OPENINGS.items():
+            position = Position(self.rows, self.columns, self.connect, 0, 0)
+            for column in moves:
+                position = self.play_position(position, column)
+            book[position.canonical().key] = score
+        return book
+
+    def play_position(self, position, column):
+        # Position after the side to move plays column (no legality checks)
+        move = (position.occupied + (1 << column * self.stride)) & self.column_masks[column]
+        imperial = position.imperial | move if position.current_player == 'Imperial' else position.imperial
+        return Position(self.rows, self.columns, self.connect, imperial, position.occupied | move)
+
+    def non_losing_moves(self, current, mask):
+        """Playable cells that do not hand the opponent an immediate win."""
+        possible = (mask + self.bottom) & self.board_mask
+        opponent_threats = self.threats(current ^ mask, mask)
+        forced = possible & opponent_threats
+        if forced:
+            if forced & (forced - 1):
+                return 0  # Two threats at once cannot both be blocked
+            possible = forced
+        return possible & ~(opponent_threats >> 1)  # Never play right below an opponent threat
+
+    def book_score(self, current, mask):
+        moves = popcount(mask)
+        imperial = current if moves % 2 == 0 else current ^ mask
+        position = Position(self.rows, self.columns, self.connect, imperial, mask)
+        return self.book.get(position.canonical().key)
+
+    def exact_negamax(self, current, mask, alpha, beta):
+        """Exact score within (alpha, beta); the side to move must not have an immediate win."""
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 1023 == 0 and self.out_of_time():
+            raise SearchTimeout()
+        moves = popcount(mask)
+        possible = self.non_losing_moves(current, mask)
+        if not possible:
+            return -((self.cells - moves) // 2)  # Every move lets the opponent win next
+        if moves >= self.cells - 2:
+            return 0  # Neither side can win with the last two pieces
+        # Bounds from the number of pieces left for each side
+        low = -((self.cells - 2 - moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+        high = (self.cells - 1 - moves) // 2
+        key = current + mask + self.bottom
+        entry = self.table.probe(key)
+        if entry is not None:
+            _, flag, score, _ = entry
+            if flag == LOWER:
+                low = score
+                if alpha < low:
+                    alpha = low
+                    if alpha >= beta:
+                        return alpha
+            else:
+                high = score
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+        if self.tablebase is not None:
+            # Win/draw/loss only: a draw is exact, a win or loss bounds the score
+            result = self.tablebase.probe(current, mask)
+            if result == DRAW:
+                return 0
+            if result == WIN and alpha < 1:
+                alpha = 1
+                if alpha >= beta:
+                    return alpha
+            elif result == LOSS and beta > -1:
+                beta = -1
+                if alpha >= beta:
+                    return beta
+        if moves <= self.book_depth:
+            score = self.book_score(current, mask)
+            if score is not None:
+                return score
+
+        # Moves that create the most new threats first, center first on ties
+        candidates = []
+        for rank, column in enumerate(self.order):
+            move = possible & self.column_masks[column]
+            if move:
+                threats = popcount(self.threats(current | move, mask | move))
+                candidates.append((-threats, rank, move))
+        candidates.sort()
+        opponent = current ^ mask
+        for index, (_, _, move) in enumerate(candidates):
+            score = -self.exact_negamax(opponent, mask | move, -beta, -alpha)
+            if score >= beta:
+                self.cutoffs += 1
+                self.first_move_cutoffs += index == 0
+                self.table.store(key, 0, LOWER, score, None)
+                return score
+            if score > alpha:
+                alpha = score
+        self.table.store(key, 0, UPPER, alpha, None)
+        return alpha
+
+    def solve_split(self, current, mask):
+        moves = popcount(mask)
+        possible = (mask + self.bottom) & self.board_mask
+        if possible & self.threats(current, mask):
+            return (self.cells + 1 - moves) // 2  # Win on this move
+        low, high = -((self.cells - moves) // 2), (self.cells + 1 - moves) // 2
+        # Null-window searches, probing closer to zero first where cutoffs are cheap
+        while low < high:
+            median = low + (high - low) // 2
+            if median <= 0 and int(low / 2) < median:
+                median = int(low / 2)
+            elif median >= 0 and high // 2 > median:
+                median = high // 2
+            score = self.exact_negamax(current, mask, median, median + 1)
+            if score <= median:
+                high = score
+            else:
+                low = score
+        return low
+
+    def solve(self, position):
+        """Exact score of position for the side to move."""
+        self.begin_stats('solver')
+        try:
+            score = 0 if position.moves == self.cells else self.solve_split(*self.split(position))
+            self.stats.iteration(self.cells - position.moves, self.nodes)  # Solved to the end
+            return score
+        finally:
+            self.end_stats()
+
+    def analyze(self, position):
+        """Exact score of every column for the side to move; None for full columns."""
+        self.begin_stats('solver')
+        try:
+            scores = self.analyze_split(position)
+            self.stats.iteration(self.cells - position.moves, self.nodes)
+            return scores
+        finally:
+            self.end_stats()
+
+    def analyze_split(self, position):
+        current, mask = self.split(position)
+        possible = (mask + self.bottom) & self.board_mask
+        wins = possible & self.threats(current, mask)
+        scores = []
+        for column in range(self.columns):
+            move = possible & self.column_masks[column]
+            if not move:
+                scores.append(None)
+            elif move & wins:
+                scores.append((self.cells + 1 - position.moves) // 2)
+            elif position.moves + 1 == self.cells:
+                scores.append(0)
+            else:
+                scores.append(-self.solve_split(current ^ mask, mask | move))
+        return scores
+
+    def solve_move(self, position, time_limit=None, should_stop=None):
+        """Return (column, score, distance) of a best move, preferring central columns on ties.
+
+        distance is the number of plies until the game ends under perfect play.
+
+        With a time_limit (seconds) or should_stop callable, raises SearchTimeout
+        if the position cannot be solved in time.
+        """
+        if time_limit is not None:
+            self.deadline = time.monotonic() + time_limit
+            self.should_stop = should_stop
+        try:
+            scores = self.analyze(position)
+        finally:
+            self.deadline = None
+            self.should_stop = None
+        column = self.best_column(scores)
+        return column, scores[column], self.distance_to_result(scores[column], position.moves)
+
+    def best_column(self, scores):
+        # Highest score from analyze(), preferring central columns on ties
+        return max((c for c in self.order if scores[c] is not None), key=lambda c: scores[c])
+
+    def distance_to_result(self, score, moves):
+        """Plies until the game ends under perfect play, for a score of the side to move after moves plies.
+
+        Also gives the length of the game after playing a column, from that column's score in analyze().
+        """
+        if score > 0:
+            # A win on this move scores (cells + 1 - moves) // 2, one less for each later move of the winner
+            return 2 * ((self.cells + 1 - moves) // 2 - score) + 1
+        if score < 0:
+            # The opponent scores the loss from its own turn, one ply later
+            return 2 * ((self.cells - moves) // 2 + score) + 2
+        return self.cells - moves
+
+
+def outcome(score):
+    # 'win', 'draw' or 'loss' for the side to move
+    return 'win' if score > 0 else 'loss' if score < 0 else 'draw'
@@ -0,0 +1,16 @@
+from .AIWorker import load_book, load_tablebases
+from .Solver import Solver
+from .TranspositionTable import TranspositionTable
+
+solver = None  # One per pool process, so its transposition table carries over between positions
+
+
+def init_worker(rows, columns, connect, megabytes, book_path=None, tablebase_dir=None):
+    """Pool initializer: give this process its own Solver, with the book and tablebases if there are any.
+
+    Tasks then read it as SolverPool.solver, not through a from-import taken before it was set.
+    """
+    global solver
+    solver = Solver(rows, columns, connect, TranspositionTable(megabytes),
+                    book=load_book(book_path, rows, columns, connect))
+    solver.tablebase = load_tablebases(tablebase_dir, rows, columns, connect)
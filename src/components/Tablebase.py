@@ -0,0 +1,248 @@
+import mmap
+import os
+import struct
+from math import comb
+import numpy as np
+from .Position import popcount
+
+MAGIC = b'C4TB'
+HEADER = struct.Struct('<4sBBB5xQQQ')  # Magic, rows, columns, connect, base Imperial pieces, base height mask, entries
+
+# Results for the side to move, two bits each; 0 marks an entry outside the table
+LOSS, DRAW, WIN = 1, 2, 3
+
+
+class TablebaseIndex:
+    """Perfect index of every position that extends a base position.
+
+    A position is described by how many pieces each column holds above the
+    base (its profile) and by which of those added pieces are Imperial,
+    read column by column from the bottom as one word. Turns alternate, so
+    the number of Imperial pieces in the word is fixed by the piece count,
+    and the word is ranked among the words with that many ones. Profiles
+    are laid out one after another, so the index is a bijection onto
+    range(count) with no gaps and no stored keys.
+    """
+
+    def __init__(self, rows, columns, connect, base_imperial=0, base_occupied=0):
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.base_imperial = base_imperial
+        self.base_occupied = base_occupied
+        self.stride = rows + 1
+        self.column_mask = (1 << self.stride) - 1
+        self.base_heights = [((base_occupied >> (c * self.stride)) & self.column_mask).bit_length()
+                             for c in range(columns)]
+        self.base_moves = popcount(base_occupied)
+        self.capacity = [rows - height for height in self.base_heights]  # Empty cells per column
+        self.empty = sum(self.capacity)
+        self.binomials = np.array([[comb(n, k) for k in range(self.empty + 2)] for n in range(self.empty + 2)],
+                                  dtype=np.int64)
+        # Mixed-radix profile numbers, column 0 least significant
+        self.radix = [1]
+        for capacity in self.capacity[:-1]:
+            self.radix.append(self.radix[-1] * (capacity + 1))
+        self.offsets = []
+        self.layers = [[] for _ in range(self.empty + 1)]  # Profiles by number of added pieces
+        count = 0
+        for number in range(self.radix[-1] * (self.capacity[-1] + 1)):
+            profile = tuple((number // self.radix[c]) % (self.capacity[c] + 1) for c in range(columns))
+            added = sum(profile)
+            self.offsets.append(count)
+            self.layers[added].append((number, profile))
+            count += comb(added, self.imperial_count(added))
+        self.count = count
+
+    def imperial_count(self, added):
+        # Imperial pieces among the added ones; Imperial moves whenever the total move count is even
+        return (added + 1) // 2 if self.base_moves % 2 == 0 else added // 2
+
+    def index(self, imperial, occupied):
+        """Index of a position, or None if it does not extend the base position."""
+        if occupied & self.base_occupied != self.base_occupied or imperial & self.base_occupied != self.base_imperial:
+            return None
+        number = word = position = 0
+        for c in range(self.columns):
+            added = ((occupied >> (c * self.stride)) & self.column_mask).bit_length() - self.base_heights[c]
+            number += added * self.radix[c]
+            word |= ((imperial >> (c * self.stride + self.base_heights[c])) & ((1 << added) - 1)) << position
+            position += added
+        if popcount(word) != self.imperial_count(position):
+            return None  # Not a position reachable with alternating turns
+        # Colex rank: each Imperial piece at word bit i, the j-th one, counts C(i, j)
+        rank, ones = 0, 0
+        while word:
+            bit = word & -word
+            ones += 1
+            rank += comb(bit.bit_length() - 1, ones)
+            word ^= bit
+        return self.offsets[number] + rank
+
+    def rank_words(self, words, added):
+        # Vectorized colex rank of added-bit words
+        rank = np.zeros(len(words), dtype=np.int64)
+        ones = np.zeros(len(words), dtype=np.int64)
+        for i in range(added):
+            bit = ((words >> np.uint64(i)) & np.uint64(1)).astype(np.int64)
+            ones += bit
+            rank += bit * self.binomials[i, ones]
+        return rank
+
+    def unrank_words(self, ranks, added):
+        # Inverse of rank_words, taking the highest bit whose binomial still fits
+        words = np.zeros(len(ranks), dtype=np.uint64)
+        remaining = ranks.copy()
+        ones = np.full(len(ranks), self.imperial_count(added), dtype=np.int64)
+        for i in range(added - 1, -1, -1):
+            binomial = self.binomials[i, ones]
+            take = (ones > 0) & (remaining >= binomial)
+            words |= take.astype(np.uint64) << np.uint64(i)
+            remaining -= np.where(take, binomial, 0)
+            ones -= take
+        return words
+
+    def boards(self, profile, words):
+        # (Imperial pieces, height mask) arrays for a profile and its colouring words
+        imperial = np.full(len(words), self.base_imperial, dtype=np.uint64)
+        occupied = self.base_occupied
+        position = 0
+        for c, added in enumerate(profile):
+            shift = c * self.stride + self.base_heights[c]
+            bits = (words >> np.uint64(position)) & np.uint64((1 << added) - 1)
+            imperial |= bits << np.uint64(shift)
+            occupied |= ((1 << added) - 1) << shift
+            position += added
+        return imperial, np.uint64(occupied)
+
+
+def has_line(pieces, stride, connect):
+    # Vectorized shift-AND win check over an array of bitboards
+    found = np.zeros(len(pieces), dtype=bool)
+    for shift in (1, stride, stride + 1, stride - 1):
+        line = pieces
+        for _ in range(connect - 1):
+            line = line & (line >> np.uint64(shift))
+        found |= line != 0
+    return found
+
+
+def packed_values(packed, indices):
+    return (packed[indices >> 2] >> ((indices & 3) * 2).astype(np.uint8)) & 3
+
+
+def build_tablebase(path, rows, columns, connect, base_imperial=0, base_occupied=0, chunk=1 << 18, progress=None):
+    """Solve every position extending the base position by retrograde analysis and write the table.
+
+    Layers are solved from the full board back to the base, so every child
+    is known when its parent is reached. The table is written in place
+    through a memory map, two bits per position. progress(added), if given,
+    is called after each layer.
+    """
+    index = TablebaseIndex(rows, columns, connect, base_imperial, base_occupied)
+    if columns * index.stride > 64:
+        raise ValueError("Boards of this size do not fit 64-bit bitboards")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as table_file:
+        table_file.write(HEADER.pack(MAGIC, rows, columns, connect, base_imperial, base_occupied, index.count))
+        table_file.truncate(HEADER.size + (index.count + 3) // 4)
+    packed = np.memmap(temporary, dtype=np.uint8, mode='r+', offset=HEADER.size, shape=((index.count + 3) // 4,))
+
+    for added in range(index.empty, -1, -1):
+        imperial_to_move = (index.base_moves + added) % 2 == 0
+        for number, profile in index.layers[added]:
+            total = comb(added, index.imperial_count(added))
+            for start in range(0, total, chunk):
+                ranks = np.arange(start, min(total, start + chunk), dtype=np.int64)
+                words = index.unrank_words(ranks, added)
+                imperial, occupied = index.boards(profile, words)
+                previous = (occupied ^ imperial) if imperial_to_move else imperial
+                lost = has_line(previous, index.stride, connect)  # The last move won
+                values = np.full(len(ranks), DRAW, dtype=np.uint8)  # Full board without a line
+                if added < index.empty:
+                    values[:] = 0
+                    position = 0
+                    for c in range(columns):
+                        if profile[c] < index.capacity[c]:
+                            # Insert the new piece into the word and rank the child
+                            split = np.uint64(position + profile[c])
+                            low = words & np.uint64((1 << (position + profile[c])) - 1)
+                            high = (words >> split) << (split + np.uint64(1))
+                            new = np.uint64(int(imperial_to_move)) << split
+                            child = index.offsets[number + index.radix[c]] + index.rank_words(low | new | high, added + 1)
+                            values = np.maximum(values, 4 - packed_values(packed, child))  # Child's result, negated
+                        position += profile[c]
+                values[lost] = LOSS
+                slots = index.offsets[number] + ranks
+                np.bitwise_or.at(packed, slots >> 2, values << ((slots & 3) * 2).astype(np.uint8))
+        if progress is not None:
+            progress(added)
+    packed.flush()
+    del packed
+    os.replace(temporary, path)
+    return index.count
+
+
+class Tablebase:
+    """Read-only win/draw/loss table, memory-mapped like the OpeningBook."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as table_file:
+            self.data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError(f"Not a tablebase: {path}")
+        magic, rows, columns, connect, base_imperial, base_occupied, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or len(self.data) != HEADER.size + (count + 3) // 4:
+            self.data.close()
+            raise ValueError(f"Not a tablebase: {path}")
+        self.index = TablebaseIndex(rows, columns, connect, base_imperial, base_occupied)
+        self.rows, self.columns, self.connect = rows, columns, connect
+
+    def close(self):
+        self.data.close()
+
+    def matches(self, rows, columns, connect):
+        return (self.rows, self.columns, self.connect) == (rows, columns, connect)
+
+    def value(self, imperial, occupied):
+        """WIN, DRAW or LOSS for the side to move, or None outside the table."""
+        index = self.index.index(imperial, occupied)
+        if index is None:
+            return None
+        return (self.data[HEADER.size + (index >> 2)] >> ((index & 3) * 2)) & 3 or None
+
+    def probe(self, current, mask):
+        # Same as value() for a search node: current holds the pieces of the side to move
+        return self.value(current if popcount(mask) % 2 == 0 else current ^ mask, mask)
+
+    def probe_position(self, position):
+        return self.value(position.imperial, position.occupied)
+
+
+class TablebaseSet:
+    """Several tablebases of one board probed as one, such as tables built from different base positions."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def close(self):
+        for table in self.tables:
+            table.close()
+
+    def value(self, imperial, occupied):
+        for table in self.tables:
+            result = table.value(imperial, occupied)
+            if result is not None:
+                return result
+        return None
+
+    def probe(self, current, mask):
+        return self.value(current if popcount(mask) % 2 == 0 else current ^ mask, mask)
+
+    def probe_position(self, position):
+        return self.value(position.imperial, position.occupied)
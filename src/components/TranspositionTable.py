@@ -0,0 +1,203 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# Bound types of a stored score
+EXACT, LOWER, UPPER = 0, 1, 2
+
+ENTRY = np.dtype([
+    ('key', np.uint64),
+    ('score', np.int32),
+    ('depth', np.int8),  # -1 marks an empty slot
+    ('flag', np.int8),
+    ('move', np.int8),
+])
+
+# Replacement schemes: a depth-preferred slot backed by an always-replace slot,
+# or a single slot per bucket with either policy
+TWO_TIER, DEPTH_PREFERRED, ALWAYS_REPLACE = 'two-tier', 'depth-preferred', 'always-replace'
+
+KEY_MASK = 0xFFFFFFFFFFFFFFFF
+MAX_DEPTH = 127  # Largest depth the int8 field holds
+
+
+def table_key(key):
+    """The key as stored: the position key itself when it fits in 64 bits, else a 64-bit hash of it.
+
+    Boards with more than 64 bit positions, such as 8x8, have longer keys;
+    those are folded 64 bits at a time. The stored hash still verifies the
+    probe, with the same odds of a false match as a 64-bit Zobrist hash.
+    """
+    if key <= KEY_MASK:
+        return key
+    folded = 0
+    while key:
+        folded = ((folded ^ (key & KEY_MASK)) * 0x9E3779B97F4A7C15) & KEY_MASK
+        folded ^= folded >> 29
+        key >>= 64
+    return folded
+
+
+class TranspositionTable:
+    """Fixed-size transposition table backed by a NumPy structured array.
+
+    The table never grows: it is sized once from a memory budget in MB and
+    rounded down to a power-of-two number of buckets. With the two-tier
+    scheme every bucket has a depth-preferred slot, which keeps the deepest
+    result, and an always-replace slot for everything else.
+    """
+
+    def __init__(self, megabytes=16, replacement=TWO_TIER, buffer=None):
+        if replacement not in (TWO_TIER, DEPTH_PREFERRED, ALWAYS_REPLACE):
+            raise ValueError(f"Unknown replacement scheme: {replacement}")
+        self.megabytes = megabytes
+        self.replacement = replacement
+        buckets, slots = self.shape(megabytes, replacement)
+        self.index_shift = 64 - (buckets.bit_length() - 1)
+        if buffer is None:
+            self.entries = np.zeros((buckets, slots), dtype=ENTRY)
+        else:
+            self.entries = np.ndarray((buckets, slots), dtype=ENTRY, buffer=buffer)  # Entries live in memory owned elsewhere
+        # Field views, which index faster than whole records
+        self.keys = self.entries['key']
+        self.scores = self.entries['score']
+        self.depths = self.entries['depth']
+        self.flags = self.entries['flag']
+        self.moves = self.entries['move']
+        self.probes = 0
+        self.hits = 0
+        if buffer is None:
+            self.clear()
+
+    @staticmethod
+    def shape(megabytes, replacement):
+        # (buckets, slots per bucket) for a memory budget
+        slots = 2 if replacement == TWO_TIER else 1
+        buckets = max(1, int(megabytes * 1024 * 1024) // (slots * ENTRY.itemsize))
+        return 1 << (buckets.bit_length() - 1), slots  # Power of two, indexed by the top hash bits
+
+    @property
+    def nbytes(self):
+        return self.entries.nbytes
+
+    def clear(self):
+        self.depths[:] = -1
+        self.probes = 0
+        self.hits = 0
+
+    def bucket(self, key):
+        # Fibonacci hashing spreads structured keys evenly over the buckets
+        return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self.index_shift
+
+    def probe(self, key):
+        """Return (depth, flag, score, move) stored for key, or None."""
+        key = table_key(key)
+        self.probes += 1
+        bucket = self.bucket(key)
+        for slot in range(self.depths.shape[1]):
+            if self.keys[bucket, slot] == key and self.depths[bucket, slot] >= 0:
+                self.hits += 1
+                return (int(self.depths[bucket, slot]), int(self.flags[bucket, slot]),
+                        int(self.scores[bucket, slot]), int(self.moves[bucket, slot]))
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        key = table_key(key)
+        depth = min(depth, MAX_DEPTH)  # A shallower claim is always safe
+        bucket = self.bucket(key)
+        if self.replacement == TWO_TIER:
+            # Same position or a result at least as deep takes the depth-preferred slot;
+            # anything else goes to the always-replace slot
+            if self.keys[bucket, 0] == key or depth >= self.depths[bucket, 0]:
+                if self.keys[bucket, 0] != key:
+                    self.entries[bucket, 1] = self.entries[bucket, 0]  # Demote the old deep entry
+                slot = 0
+            else:
+                slot = 1
+        elif self.replacement == DEPTH_PREFERRED:
+            if self.keys[bucket, 0] != key and depth < self.depths[bucket, 0]:
+                return
+            slot = 0
+        else:
+            slot = 0
+        self.keys[bucket, slot] = key
+        self.depths[bucket, slot] = depth
+        self.flags[bucket, slot] = flag
+        self.scores[bucket, slot] = score
+        self.moves[bucket, slot] = -1 if move is None else move
+
+
+def pack_entry(depth, flag, score, move):
+    # Everything but the key as one 64-bit word, for the shared table's checksum
+    return (score & 0xFFFFFFFF) | (depth & 0xFF) << 32 | (flag & 0xFF) << 40 | (move & 0xFF) << 48
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Transposition table in shared memory, written by several processes without locks.
+
+    The key field holds the key XOR the rest of the entry. A probe only
+    trusts an entry whose fields XOR back to the probed key, so an entry
+    torn by two processes writing at once reads as a miss instead of a
+    wrong score. Pickling attaches to the same block, which lets the table
+    be handed to worker processes; the creating process calls unlink().
+    """
+
+    def __init__(self, megabytes=16, replacement=TWO_TIER, name=None):
+        buckets, slots = self.shape(megabytes, replacement)
+        size = buckets * slots * ENTRY.itemsize
+        if name is None:
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shared_memory = shared_memory.SharedMemory(name=name)
+        self.name = self.shared_memory.name
+        super().__init__(megabytes, replacement, self.shared_memory.buf[:size])
+        if name is None:
+            self.clear()
+
+    def __reduce__(self):
+        return (SharedTranspositionTable, (self.megabytes, self.replacement, self.name))
+
+    def close(self):
+        # Drop the NumPy views first: the block cannot close while they export its buffer
+        self.entries = self.keys = self.scores = self.depths = self.flags = self.moves = None
+        self.shared_memory.close()
+
+    def unlink(self):
+        self.shared_memory.unlink()
+
+    def entry(self, bucket, slot):
+        # (key, depth, flag, score, move) of a slot, with the checksum removed
+        depth, flag = int(self.depths[bucket, slot]), int(self.flags[bucket, slot])
+        score, move = int(self.scores[bucket, slot]), int(self.moves[bucket, slot])
+        return int(self.keys[bucket, slot]) ^ pack_entry(depth, flag, score, move), depth, flag, score, move
+
+    def probe(self, key):
+        key = table_key(key)
+        self.probes += 1
+        bucket = self.bucket(key)
+        for slot in range(self.depths.shape[1]):
+            stored_key, depth, flag, score, move = self.entry(bucket, slot)
+            if stored_key == key and depth >= 0:
+                self.hits += 1
+                return depth, flag, score, move
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        key = table_key(key)
+        depth = min(depth, MAX_DEPTH)  # A shallower claim is always safe
+        bucket = self.bucket(key)
+        slot = 0
+        if self.replacement != ALWAYS_REPLACE:
+            stored_key, stored_depth = self.entry(bucket, 0)[:2]
+            if stored_key != key and depth < stored_depth:
+                if self.replacement == DEPTH_PREFERRED:
+                    return
+                slot = 1
+            elif stored_key != key and self.replacement == TWO_TIER:
+                self.entries[bucket, 1] = self.entries[bucket, 0]  # Demote the old deep entry, checksum included
+        move = -1 if move is None else move
+        # Data first and the key last, so a reader racing the write sees a checksum mismatch
+        self.depths[bucket, slot] = depth
+        self.flags[bucket, slot] = flag
+        self.scores[bucket, slot] = score
+        self.moves[bucket, slot] = move
+        self.keys[bucket, slot] = key ^ pack_entry(depth, flag, score, move)
@@ -1,2 +1,7 @@
 # components/__init__.py
-from .Game import Game  # Asegúrate de que esto esté presente si necesitas importar Game
+def __getattr__(name):
+    # Import Game lazily so the pygame-free modules (GameState, BitBoard, ...) load headless
+    if name == 'Game':
+        from .Game import Game
+        return Game
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
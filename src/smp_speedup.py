@@ -0,0 +1,37 @@
+"""Measure how much faster the parallel search reaches a fixed depth on more cores.
+
+    python src/smp_speedup.py --depth 14 --cores 1,2,4,8,16
+"""
+import argparse
+import os
+from components.GameState import GameState
+from components.LazySMP import speedup_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lazy-SMP speedup per core count.")
+    parser.add_argument('--depth', type=int, default=12)
+    parser.add_argument('--cores', default=None, help="Comma-separated core counts; 1 is always measured first "
+                                                      "as the baseline (default: 1, 2, 4, ... up to all cores)")
+    parser.add_argument('--moves', default='', help="Opening moves as 1-based column digits, e.g. 4453")
+    parser.add_argument('--table-mb', type=int, default=64)
+    args = parser.parse_args()
+    if args.cores:
+        core_counts = [int(cores) for cores in args.cores.split(',')]
+    else:
+        core_counts = [1 << power for power in range(os.cpu_count().bit_length()) if 1 << power <= os.cpu_count()]
+
+    try:
+        state = GameState.from_moves(args.moves)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{'cores':>5} {'seconds':>9} {'nodes':>10} {'speedup':>8}")
+    for cores, seconds, nodes, speedup in speedup_report(state.position(), args.depth, core_counts, args.table_mb):
+        print(f"{cores:>5} {seconds:>9.2f} {nodes:>10} {speedup:>8.2f}")
+        if speedup < 1:
+            print(f"warning: {cores} cores were slower than 1 core; the machine may not have that many free cores, "
+                  f"or the depth is too shallow to outweigh starting the processes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Solve many positions exactly, streaming the results in input order.
+
+Each input line is a position as 1-based column digits, e.g. "4453" (an
+empty line is the empty board). Each output line repeats it with the exact
+score for the side to move, a best column and the plies left until the
+game ends under perfect play, with "-" for the empty board:
+
+    4453 -2 3 36
+    - 1 4 41
+
+A positive score wins, a negative one loses, 0 is a draw; the larger its
+size, the sooner the game ends. Positions that are illegal or already over
+get "invalid" instead. Lines are read lazily and only a bounded number of
+chunks is in flight, so memory stays flat however long the input is:
+
+    python src/solve_batch.py positions.txt > labels.txt
+    generate_positions | python src/solve_batch.py --workers 16
+"""
+import argparse
+import collections
+import itertools
+import multiprocessing
+import os
+import sys
+from components import SolverPool
+from components.GameState import GameState
+from components.Search import SearchTimeout
+
+
+def solve_line(moves, time_limit):
+    # Output line for one input position; "-" stands for the empty board so every line has three fields
+    solver = SolverPool.solver
+    label = moves or '-'
+    try:
+        state = GameState.from_moves(moves, solver.rows, solver.columns, solver.connect)
+    except ValueError:
+        return f"{label} invalid"
+    try:
+        column, score, distance = solver.solve_move(state.position(), time_limit)
+    except SearchTimeout:
+        return f"{label} timeout"
+    return f"{label} {score} {column + 1} {distance}"
+
+
+def solve_chunk(task):
+    lines, time_limit = task
+    return [solve_line(moves, time_limit) for moves in lines]
+
+
+def chunks(lines, size):
+    # Lists of up to size stripped lines, read from the input only as they are needed
+    lines = (line.strip() for line in lines)
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve positions read line by line, in parallel, in input order.")
+    parser.add_argument('input', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk', type=int, default=64, help="Positions per task sent to a worker")
+    parser.add_argument('--in-flight', type=int, default=4, help="Tasks queued per worker at most")
+    parser.add_argument('--time-limit', type=float, help="Seconds per position before giving up with 'timeout'")
+    parser.add_argument('--table-mb', type=int, default=64, help="Transposition table size per worker")
+    parser.add_argument('--book', default='assets/books/opening_book.bin', help="Opening book to use if it exists")
+    parser.add_argument('--tablebases', default='assets/tablebases', help="Directory of tablebases to use if it exists")
+    args = parser.parse_args()
+
+    pending = collections.deque()  # Results in input order; the window that bounds memory
+    limit = args.workers * args.in_flight
+    with multiprocessing.get_context('spawn').Pool(args.workers, SolverPool.init_worker,
+                                                   (args.rows, args.columns, args.connect, args.table_mb, args.book,
+                                                    args.tablebases)) as pool:
+        for chunk in chunks(args.input, args.chunk):
+            pending.append(pool.apply_async(solve_chunk, ((chunk, args.time_limit),)))
+            if len(pending) >= limit:
+                # Wait for the oldest task before reading more input; later ones keep running meanwhile
+                sys.stdout.write('\n'.join(pending.popleft().get()) + '\n')
+                sys.stdout.flush()
+        while pending:
+            sys.stdout.write('\n'.join(pending.popleft().get()) + '\n')
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Check "find the winning move" puzzles with the proof-number search.
+
+Each line of the puzzle file holds a position as 1-based column digits and
+the intended solution column, e.g. "4453 3". A puzzle is sound when the
+solution is the only move that forces a win:
+
+    python src/verify_puzzles.py puzzles.txt
+"""
+import argparse
+import sys
+from components.GameState import GameState
+from components.ProofNumberSearch import ProofNumberSearch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify that each puzzle has exactly one winning move.")
+    parser.add_argument('puzzles', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4)
+    parser.add_argument('--time-limit', type=float, default=10.0, help="Seconds per puzzle")
+    parser.add_argument('--table-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    search = ProofNumberSearch(args.rows, args.columns, args.connect, args.table_mb)
+    failures = 0
+    for number, line in enumerate(args.puzzles, 1):
+        if not line.strip() or line.startswith('#'):
+            continue
+        moves, solution = line.split()
+        try:
+            state = GameState.from_moves(moves, args.rows, args.columns, args.connect)
+        except ValueError as error:
+            print(f"{number}: {error}")
+            failures += 1
+            continue
+        columns = search.winning_moves(state.position(), args.time_limit)
+        if columns is None:
+            verdict = "undecided within the time limit"
+        elif columns == [int(solution) - 1]:
+            verdict = "ok"
+        elif not columns:
+            verdict = "no forced win"
+        else:
+            verdict = f"winning moves are {' '.join(str(c + 1) for c in columns)}"
+        if verdict != "ok":
+            failures += 1
+        print(f"{number}: {moves} {solution}: {verdict} ({search.stats.nodes} nodes, {search.stats.seconds:.2f}s)")
+    print(f"{failures} puzzle(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
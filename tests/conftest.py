@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The game runs with src/ as its working directory, so the components package lives there
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
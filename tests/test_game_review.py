@@ -0,0 +1,21 @@
+from components.GameReview import MoveReview
+from components.Search import TABLEBASE_WIN, WIN_SCORE
+
+
+def test_tablebase_win_thrown_into_loss_is_a_blunder():
+    review = MoveReview(20, 'Rebel', 1, [TABLEBASE_WIN, -TABLEBASE_WIN, 0, None, 0, 0, 0], False)
+    assert (review.result_before, review.result_after) == ('win', 'loss')
+    assert review.changed_result
+    assert not review.sharp_drop
+    assert review.describe() == "21. Rebel column 2: blunder, turns win into loss (column 1 was best)"
+
+
+def test_counted_win_thrown_into_draw_is_a_blunder():
+    review = MoveReview(10, 'Imperial', 0, [0, WIN_SCORE - 13, 0, 0, 0, 0, 0], False)
+    assert review.changed_result and review.result_before == 'win'
+
+
+def test_heuristic_swing_is_a_sharp_drop():
+    review = MoveReview(4, 'Imperial', 0, [-2, 3, 0, 0, 0, 0, 0], False)
+    assert not review.changed_result
+    assert review.sharp_drop
@@ -0,0 +1,71 @@
+import random
+from functools import lru_cache
+import pytest
+from components.GameState import GameState
+from components.Solver import Solver
+
+
+def brute_force(solver):
+    """(result, plies left) under perfect play by plain minimax: wins as soon, losses as late as possible."""
+
+    @lru_cache(maxsize=None)
+    def value(current, mask):
+        possible = (mask + solver.bottom) & solver.board_mask
+        if not possible:
+            return 0, 0
+        if possible & solver.threats(current, mask):
+            return 1, 1
+        best = None
+        for column_mask in solver.column_masks:
+            move = possible & column_mask
+            if move:
+                result, plies = value(current ^ mask, mask | move)
+                child = (-result, plies + 1)
+                if best is None or rank(child) > rank(best):
+                    best = child
+        return best
+
+    def rank(value):
+        result, plies = value
+        return result, -plies if result > 0 else plies
+
+    return value
+
+
+def random_positions(rows, columns, moves, count, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState(rows, columns)
+        while len(state.history) < moves and not state.is_over():
+            state.drop(rng.choice([c for c in range(columns) if state.can_drop(c)]))
+        if not state.is_over():
+            positions.append(state.position())
+    return positions
+
+
+@pytest.mark.parametrize('rows, columns, moves', [(4, 4, 2), (4, 4, 6), (4, 5, 7), (4, 5, 10), (5, 5, 6)])
+def test_distance_matches_brute_force(rows, columns, moves):
+    solver = Solver(rows, columns)
+    value = brute_force(solver)
+    for position in random_positions(rows, columns, moves, 5, seed=moves):
+        current, mask = solver.split(position)
+        result, plies = value(current, mask)
+        column, score, distance = solver.solve_move(position)
+        assert (score > 0) - (score < 0) == result
+        assert distance == plies
+        # Every column's score gives the length of the game after playing it
+        possible = (mask + solver.bottom) & solver.board_mask
+        for c, column_score in enumerate(solver.analyze(position)):
+            if column_score is not None:
+                move = possible & solver.column_masks[c]
+                if move & solver.threats(current, mask):
+                    expected = 1
+                else:
+                    expected = value(current ^ mask, mask | move)[1] + 1
+                assert solver.distance_to_result(column_score, position.moves) == expected
+
+
+def test_odd_board_win_on_this_move():
+    solver = Solver(5, 5)
+    assert solver.distance_to_result((solver.cells + 1 - 6) // 2, 6) == 1
@@ -0,0 +1,32 @@
+import pytest
+from components.AIWorker import load_tablebases
+from components.Tablebase import Tablebase, build_tablebase, HEADER
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = str(tmp_path / '3x3.bin')
+    build_tablebase(path, 3, 3, 3)
+    return path
+
+
+def test_valid_table_loads(table_path):
+    table = Tablebase(table_path)
+    assert table.matches(3, 3, 3)
+    table.close()
+
+
+@pytest.mark.parametrize('size', [0, 5, HEADER.size - 1, HEADER.size, HEADER.size + 1])
+def test_truncated_table_is_rejected(table_path, tmp_path, size):
+    truncated = tmp_path / 'truncated.bin'
+    with open(table_path, 'rb') as table_file:
+        truncated.write_bytes(table_file.read(size))
+    with pytest.raises(ValueError):
+        Tablebase(str(truncated))
+
+
+def test_load_tablebases_skips_corrupt_files(table_path, tmp_path):
+    (tmp_path / 'short.bin').write_bytes(b'short')
+    tables = load_tablebases(str(tmp_path), 3, 3, 3)
+    assert [table.path for table in tables.tables] == [table_path]
+    tables.close()